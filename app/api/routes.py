@@ -1,13 +1,14 @@
-import threading
+import asyncio
 from pathlib import Path
-from typing import List
+from typing import List, Optional, Union
 
-from fastapi import APIRouter, HTTPException, Query, Request
+import orjson
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, Request
 from fastapi.responses import StreamingResponse, FileResponse, RedirectResponse
 
-from app.models.schemas import AgentStatus, BatchRequest, LessonRequest, StopRequest
+from app.models.schemas import AgentStatus, BatchRequest, LessonRequest, LogsDelta, StopRequest
 from app.deps.database import get_db
-from app.services.agent_runner import run_batch_agent, run_single_agent, stop_agent_by_session
+from app.services.agent_runner import read_logs_since, run_batch_agent, run_single_agent, stop_agent_by_session
 from app.services.questions import build_questions_csv
 from app.services.sessions import agent_sessions, create_session
 from app.services.frontend import (
@@ -20,10 +21,65 @@ from app.services.frontend import (
 
 router = APIRouter()
 
+# How often the event stream checks a session for changes, and how long it may
+# stay silent before sending a keep-alive comment
+STREAM_POLL_INTERVAL = 0.25
+STREAM_KEEPALIVE_SECONDS = 15
+
+
+def build_agent_status(session_id: str) -> AgentStatus:
+    """Build the status of a session (an idle status when it does not exist)."""
+    if not session_id:
+        return AgentStatus(running=False, current_lesson=None, last_run=None, log_count=0, session_id=None)
+
+    session = agent_sessions.get(session_id)
+    if not session:
+        return AgentStatus(running=False, current_lesson=None, last_run=None, log_count=0, session_id=session_id)
+
+    return AgentStatus(
+        running=session.get("running", False),
+        current_lesson=session.get("current_lesson"),
+        last_run=session.get("last_run"),
+        log_count=len(session.get("logs", [])),
+        session_id=session_id,
+    )
+
+
+async def agent_event_stream(request: Request, session_id: str):
+    """
+    Yield an SSE event whenever the session's status changes or log lines are
+    added; each event carries the status and only the new lines.
+
+    Once the session is no longer running, the final status and lines are sent
+    followed by an `end` event, and the stream closes.
+    """
+    last_status = None
+    cursor = 0
+    idle = 0.0
+    while not await request.is_disconnected():
+        status = build_agent_status(session_id).model_dump()
+        session = agent_sessions.get(session_id)
+        new_logs, cursor = read_logs_since(session, cursor)[:2] if session else ([], cursor)
+
+        if new_logs or status != last_status:
+            last_status = status
+            idle = 0.0
+            yield f"data: {orjson.dumps({'status': status, 'new_logs': new_logs}).decode()}\n\n"
+        if not status["running"]:
+            # Tells the client not to reconnect
+            yield "event: end\ndata: {}\n\n"
+            return
+        if idle >= STREAM_KEEPALIVE_SECONDS:
+            idle = 0.0
+            yield ": keep-alive\n\n"
+
+        await asyncio.sleep(STREAM_POLL_INTERVAL)
+        idle += STREAM_POLL_INTERVAL
+
 
 def register_routes(logger):
     @router.post("/api/agent/start")
-    async def start_agent(request: LessonRequest):
+    async def start_agent(request: LessonRequest, background_tasks: BackgroundTasks):
         """Start the agent - creates new session for this user."""
         if not request.unix_email or not request.unix_password:
             raise HTTPException(status_code=400, detail="UniX email and password are required")
@@ -31,23 +87,20 @@ def register_routes(logger):
         logger.info("API start single requested: lesson=%s", request.lesson_id)
         session_id = create_session(logger=logger, mode="single")
 
-        thread = threading.Thread(
-            target=run_single_agent,
-            args=(
-                session_id,
-                request.lesson_id,
-                request.skip_video,
-                request.unix_email,
-                request.unix_password,
-                logger,
-            ),
+        # Runs on the event loop after the response is sent
+        background_tasks.add_task(
+            run_single_agent,
+            session_id,
+            request.lesson_id,
+            request.skip_video,
+            request.unix_email,
+            request.unix_password,
+            logger,
         )
-        thread.daemon = True
-        thread.start()
         return {"message": "Agent started", "lesson_id": request.lesson_id, "session_id": session_id}
 
     @router.post("/api/agent/batch")
-    async def start_batch_agent(request: BatchRequest):
+    async def start_batch_agent(request: BatchRequest, background_tasks: BackgroundTasks):
         """Start batch agent - processes comma-separated lesson IDs sequentially."""
         if not request.unix_email or not request.unix_password:
             raise HTTPException(status_code=400, detail="UniX email and password are required")
@@ -57,19 +110,15 @@ def register_routes(logger):
         logger.info("API start batch requested: lesson_ids=%s", request.lesson_ids)
         session_id = create_session(logger=logger, mode="batch")
 
-        thread = threading.Thread(
-            target=run_batch_agent,
-            args=(
-                session_id,
-                request.lesson_ids,
-                request.skip_video,
-                request.unix_email,
-                request.unix_password,
-                logger,
-            ),
+        background_tasks.add_task(
+            run_batch_agent,
+            session_id,
+            request.lesson_ids,
+            request.skip_video,
+            request.unix_email,
+            request.unix_password,
+            logger,
         )
-        thread.daemon = True
-        thread.start()
 
         ids = [item.strip() for item in request.lesson_ids.split(",") if item.strip()]
         return {
@@ -87,35 +136,42 @@ def register_routes(logger):
             raise HTTPException(status_code=400, detail="session_id required")
 
         logger.info("API stop requested: session=%s", session_id)
-        return stop_agent_by_session(session_id)
+        return await stop_agent_by_session(session_id)
 
     @router.get("/api/agent/status")
     async def get_agent_status(session_id: str = Query("", alias="session_id")) -> AgentStatus:
         """Get agent status for a session."""
-        if not session_id:
-            return AgentStatus(running=False, current_lesson=None, last_run=None, log_count=0, session_id=None)
-
-        session = agent_sessions.get(session_id)
-        if not session:
-            return AgentStatus(running=False, current_lesson=None, last_run=None, log_count=0, session_id=session_id)
-
-        return AgentStatus(
-            running=session.get("running", False),
-            current_lesson=session.get("current_lesson"),
-            last_run=session.get("last_run"),
-            log_count=len(session.get("logs", [])),
-            session_id=session_id,
-        )
+        return build_agent_status(session_id)
 
     @router.get("/api/agent/logs")
-    async def get_agent_logs(session_id: str = Query("", alias="session_id")) -> List[str]:
-        """Get agent logs for a session."""
-        if not session_id:
-            return []
-        session = agent_sessions.get(session_id)
+    async def get_agent_logs(
+        session_id: str = Query("", alias="session_id"),
+        since: Optional[int] = Query(None, ge=0),
+    ) -> Union[List[str], LogsDelta]:
+        """
+        Get agent logs for a session.
+
+        Without `since` all kept lines are returned. With it, only the lines
+        after that cursor; pass the returned `to` as the next `since`. If
+        `dropped_before` is past `since`, some lines were lost to the log cap.
+        """
+        session = agent_sessions.get(session_id) if session_id else None
+        if since is None:
+            return list(session.get("logs", [])) if session else []
         if not session:
-            return []
-        return session.get("logs", [])
+            return LogsDelta(from_=since, to=since, dropped_before=since, lines=[])
+
+        lines, cursor, first_kept = read_logs_since(session, since)
+        return LogsDelta(from_=since, to=cursor, dropped_before=first_kept, lines=lines)
+
+    @router.get("/api/agent/stream")
+    async def stream_agent_events(request: Request, session_id: str = Query("", alias="session_id")):
+        """Stream status changes and new log lines for a session as Server-Sent Events."""
+        return StreamingResponse(
+            agent_event_stream(request, session_id),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
 
     @router.get("/api/questions")
     async def get_questions(limit: int = 20, offset: int = 0):
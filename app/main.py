@@ -11,6 +11,8 @@ Provides a web UI to:
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 import os
 
 from app.api.routes import register_routes
@@ -20,7 +22,8 @@ from app.services.frontend import mount_frontend_assets
 
 load_dotenv()
 
-app = FastAPI(title="Uni-Bot Backend", version="3.0.0")
+# JSON bodies (logs, question lists) are encoded by orjson instead of json.dumps
+app = FastAPI(title="Uni-Bot Backend", version="3.0.0", default_response_class=ORJSONResponse)
 logger = setup_backend_logging()
 
 raw_frontend_urls = os.getenv("FRONTEND_URL", "")
@@ -36,5 +39,20 @@ if allowed_origins:
     )
     logger.info("CORS enabled for origins: %s", ", ".join(allowed_origins))
 
+
+class _GZipExceptEventStream(GZipMiddleware):
+    """GZip middleware that leaves the SSE stream alone (older Starlette buffers it)."""
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] == "/api/agent/stream":
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+# Compress the SPA index/assets and the JSON (log/question) responses for
+# clients that accept gzip
+app.add_middleware(_GZipExceptEventStream, minimum_size=500)
+
 mount_frontend_assets(app)
 app.include_router(register_routes(logger))
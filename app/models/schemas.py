@@ -1,6 +1,6 @@
-from typing import Optional
+from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class LessonRequest(BaseModel):
@@ -29,3 +29,14 @@ class AgentStatus(BaseModel):
     last_run: Optional[str]
     log_count: int
     session_id: Optional[str] = None
+
+
+class LogsDelta(BaseModel):
+    """Log lines of a session after a cursor (see GET /api/agent/logs?since=)."""
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    from_: int = Field(alias="from")
+    to: int
+    dropped_before: int
+    lines: List[str]
@@ -1,15 +1,105 @@
+import asyncio
 import os
-import subprocess
+import re
 import time
+from collections import deque
 from datetime import datetime
+from itertools import islice
 
 from fastapi import HTTPException
 
 from app.services.sessions import agent_sessions, sessions_lock
 
+# "Processing lesson 9858 (2/5)" progress lines from the batch agent; the
+# "(n/total)" part is optional
+_PROCESSING_LESSON_RE = re.compile(r"Processing lesson (\d+)(?:.*?\((\d+)/(\d+)\))?")
 
-def run_single_agent(session_id: str, lesson_id: str, skip_video: bool, unix_email: str, unix_password: str, logger):
-    """Run the agent in a background thread for a specific session."""
+# Most recent log lines kept per session; older lines drop off the deque
+SINGLE_LOG_LIMIT = 200
+BATCH_LOG_LIMIT = 500
+
+# Longest single line of agent output accepted by the pipe reader
+LINE_LIMIT = 1 << 20
+
+
+def _append_log(session: dict, line: str):
+    """Add a line to a session log and advance its cursor (total lines ever added)."""
+    session["logs"].append(line)
+    session["log_cursor"] = session.get("log_cursor", 0) + 1
+
+
+def read_logs_since(session: dict, since: int) -> tuple[list[str], int, int]:
+    """
+    Return the session log lines added after cursor `since`, the new cursor,
+    and the cursor of the oldest line still kept.
+
+    Lines that already dropped off the bounded log are skipped, so a client
+    that fell behind gets the oldest lines still kept.
+    """
+    logs = session.get("logs", [])
+    cursor = session.get("log_cursor", len(logs))
+    first_kept = cursor - len(logs)
+    # The new lines are the newest ones: copy only those, from the end
+    count = cursor - max(since, first_kept)
+    if count <= 0:
+        return [], cursor, first_kept
+    return list(islice(reversed(logs), count))[::-1], cursor, first_kept
+
+
+def _ts() -> str:
+    """Current local time as HH:MM:SS for session log lines."""
+    return time.strftime("%H:%M:%S")
+
+
+async def _start_agent_process(session: dict, cmd: list, env: dict):
+    """
+    Start unix_agent.py for a session with stdout and stderr merged into one pipe.
+
+    A stop requested while the process was being spawned (when there was no
+    handle to terminate yet) is applied as soon as the handle exists.
+    """
+    process = await asyncio.create_subprocess_exec(
+        *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT, env=env, limit=LINE_LIMIT
+    )
+    with sessions_lock:
+        session["process"] = process
+        stop_requested = session.get("stop_requested")
+    if stop_requested:
+        process.terminate()
+    return process
+
+
+async def _terminate_agent_process(process, timeout: float = 2) -> bool:
+    """
+    Terminate an agent process, killing it if it has not exited after `timeout` seconds.
+
+    Returns:
+        True if the process had to be killed
+    """
+    process.terminate()
+    try:
+        await asyncio.wait_for(process.wait(), timeout=timeout)
+        return False
+    except asyncio.TimeoutError:
+        process.kill()
+        return True
+
+
+async def _reap_agent_process(session: dict):
+    """Terminate the session's agent if it is still running after its runner failed."""
+    process = session.get("process")
+    if process is None or process.returncode is not None:
+        return
+    # E.g. the output loop raised on an over-long line: without this the agent
+    # (and its Chrome) would keep running where the Stop button cannot reach it
+    try:
+        await _terminate_agent_process(process)
+    except ProcessLookupError:
+        pass
+
+
+async def run_single_agent(session_id: str, lesson_id: str, skip_video: bool, unix_email: str, unix_password: str, logger):
+    """Run the agent as a background task on the event loop for a specific session."""
     session = agent_sessions.get(session_id)
     if not session:
         return
@@ -17,7 +107,8 @@ def run_single_agent(session_id: str, lesson_id: str, skip_video: bool, unix_ema
     session["running"] = True
     session["current_lesson"] = lesson_id
     session["mode"] = "single"
-    session["logs"] = []
+    session["logs"] = deque(maxlen=SINGLE_LOG_LIMIT)
+    session["log_cursor"] = 0
     session["process"] = None
 
     try:
@@ -38,57 +129,45 @@ def run_single_agent(session_id: str, lesson_id: str, skip_video: bool, unix_ema
             skip_video,
         )
 
-        session["logs"].append(f"[{datetime.now().strftime('%H:%M:%S')}] Starting agent for lesson {lesson_id}...")
+        _append_log(session, f"[{_ts()}] Starting agent for lesson {lesson_id}...")
 
         env = os.environ.copy()
         env["UNIX_EMAIL"] = unix_email
         env["UNIX_PASSWORD"] = unix_password
 
-        process = subprocess.Popen(
-            cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1, env=env
-        )
-        session["process"] = process
+        process = await _start_agent_process(session, cmd, env)
 
-        for line in iter(process.stdout.readline, ""):
-            if line:
-                session["logs"].append(line.strip())
-                if len(session["logs"]) > 200:
-                    session["logs"] = session["logs"][-200:]
-            if process.poll() is not None:
-                break
+        async for raw_line in process.stdout:
+            _append_log(session, raw_line.decode(errors="replace").strip())
 
-        process.wait()
-        exit_code = process.returncode
+        exit_code = await process.wait()
         if exit_code in (-9, -15):
-            session["logs"].append(f"[{datetime.now().strftime('%H:%M:%S')}] ⛔ Agent stopped by user")
+            _append_log(session, f"[{_ts()}] ⛔ Agent stopped by user")
             logger.warning("Single agent stopped by user: session=%s", session_id)
         else:
-            session["logs"].append(
-                f"[{datetime.now().strftime('%H:%M:%S')}] Agent finished with exit code {exit_code}"
-            )
+            _append_log(session, f"[{_ts()}] Agent finished with exit code {exit_code}")
             logger.info("Single agent finished: session=%s exit_code=%s", session_id, exit_code)
 
     except Exception as error:
-        session["logs"].append(f"[{datetime.now().strftime('%H:%M:%S')}] Error: {str(error)}")
+        _append_log(session, f"[{_ts()}] Error: {str(error)}")
         logger.exception("Single agent failed: session=%s error=%s", session_id, str(error))
     finally:
+        await _reap_agent_process(session)
         session["running"] = False
         session["process"] = None
         session["last_run"] = datetime.now().isoformat()
         logger.info("Single agent session closed: session=%s", session_id)
 
 
-def run_batch_agent(session_id: str, lesson_ids: str, skip_video: bool, unix_email: str, unix_password: str, logger):
+async def run_batch_agent(session_id: str, lesson_ids: str, skip_video: bool, unix_email: str, unix_password: str, logger):
     """Run batch agent: one process, one browser, same logic as single mode in a loop."""
-    import re
-
     session = agent_sessions.get(session_id)
     if not session:
         return
 
     ids = [item.strip() for item in lesson_ids.split(",") if item.strip()]
     if not ids:
-        session["logs"].append(f"[{datetime.now().strftime('%H:%M:%S')}] ❌ No valid lesson IDs provided")
+        _append_log(session, f"[{_ts()}] ❌ No valid lesson IDs provided")
         session["running"] = False
         logger.warning("Batch agent rejected empty lesson ids: session=%s", session_id)
         return
@@ -96,7 +175,8 @@ def run_batch_agent(session_id: str, lesson_ids: str, skip_video: bool, unix_ema
     session["running"] = True
     session["current_lesson"] = f"Batch: {len(ids)} lessons ({ids[0]}...)"
     session["mode"] = "batch"
-    session["logs"] = []
+    session["logs"] = deque(maxlen=BATCH_LOG_LIMIT)
+    session["log_cursor"] = 0
     session["process"] = None
 
     try:
@@ -106,11 +186,11 @@ def run_batch_agent(session_id: str, lesson_ids: str, skip_video: bool, unix_ema
             len(ids),
             skip_video,
         )
-        session["logs"].append(
-            f"[{datetime.now().strftime('%H:%M:%S')}] 🚀 Starting BATCH mode: {len(ids)} lessons (one browser session)"
+        _append_log(
+            session, f"[{_ts()}] 🚀 Starting BATCH mode: {len(ids)} lessons (one browser session)"
         )
-        session["logs"].append(f"[{datetime.now().strftime('%H:%M:%S')}] IDs: {', '.join(ids)}")
-        session["logs"].append(f"[{datetime.now().strftime('%H:%M:%S')}] Skip video: {skip_video}")
+        _append_log(session, f"[{_ts()}] IDs: {', '.join(ids)}")
+        _append_log(session, f"[{_ts()}] Skip video: {skip_video}")
 
         env = os.environ.copy()
         env["UNIX_EMAIL"] = unix_email
@@ -120,51 +200,41 @@ def run_batch_agent(session_id: str, lesson_ids: str, skip_video: bool, unix_ema
         if skip_video:
             cmd.append("--skip-video")
 
-        process = subprocess.Popen(
-            cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1, env=env
-        )
-        session["process"] = process
+        process = await _start_agent_process(session, cmd, env)
+
+        async for raw_line in process.stdout:
+            line_stripped = raw_line.decode(errors="replace").strip()
+            if "Processing lesson" in line_stripped:
+                match = _PROCESSING_LESSON_RE.search(line_stripped)
+                if match and match.group(2):
+                    session["current_lesson"] = f"Lesson {match.group(1)} ({match.group(2)}/{match.group(3)})"
+                elif match:
+                    session["current_lesson"] = f"Lesson {match.group(1)}"
+
+            _append_log(session, line_stripped)
 
-        for line in iter(process.stdout.readline, ""):
-            if line:
-                line_stripped = line.strip()
-                if "Processing lesson" in line_stripped:
-                    match = re.search(r"Processing lesson (\d+).*?\((\d+)/(\d+)\)", line_stripped)
-                    if match:
-                        session["current_lesson"] = f"Lesson {match.group(1)} ({match.group(2)}/{match.group(3)})"
-                    else:
-                        fallback_match = re.search(r"Processing lesson (\d+)", line_stripped)
-                        if fallback_match:
-                            session["current_lesson"] = f"Lesson {fallback_match.group(1)}"
-
-                session["logs"].append(line_stripped)
-                if len(session["logs"]) > 500:
-                    session["logs"] = session["logs"][-500:]
-            if process.poll() is not None:
-                break
-
-        process.wait()
-        exit_code = process.returncode
+        exit_code = await process.wait()
         session["process"] = None
 
         if exit_code in (-9, -15):
-            session["logs"].append(f"[{datetime.now().strftime('%H:%M:%S')}] ⛔ Batch stopped by user")
+            _append_log(session, f"[{_ts()}] ⛔ Batch stopped by user")
             logger.warning("Batch agent stopped by user: session=%s", session_id)
         else:
-            session["logs"].append(f"[{datetime.now().strftime('%H:%M:%S')}] 🏁 Batch complete")
+            _append_log(session, f"[{_ts()}] 🏁 Batch complete")
             logger.info("Batch agent finished: session=%s exit_code=%s", session_id, exit_code)
 
     except Exception as error:
-        session["logs"].append(f"[{datetime.now().strftime('%H:%M:%S')}] ❌ Error: {str(error)}")
+        _append_log(session, f"[{_ts()}] ❌ Error: {str(error)}")
         logger.exception("Batch agent failed: session=%s error=%s", session_id, str(error))
     finally:
+        await _reap_agent_process(session)
         session["running"] = False
         session["process"] = None
         session["last_run"] = datetime.now().isoformat()
         logger.info("Batch agent session closed: session=%s", session_id)
 
 
-def stop_agent_by_session(session_id: str):
+async def stop_agent_by_session(session_id: str):
     """Stop agent process for a given session."""
     with sessions_lock:
         session = agent_sessions.get(session_id)
@@ -172,19 +242,21 @@ def stop_agent_by_session(session_id: str):
             raise HTTPException(status_code=404, detail="Session not found")
         if not session.get("running"):
             return {"message": "Agent stopped"}
-
+        # Seen by _start_agent_process if the process is still being spawned
+        session["stop_requested"] = True
         process = session.get("process")
-        if process:
-            try:
-                process.terminate()
-                session["logs"].append(f"[{datetime.now().strftime('%H:%M:%S')}] ⏹️ Stopping agent...")
-                time.sleep(2)
-                if process.poll() is None:
-                    process.kill()
-                    session["logs"].append(f"[{datetime.now().strftime('%H:%M:%S')}] Force killed agent")
-            except Exception as error:
-                raise HTTPException(status_code=500, detail=str(error)) from error
 
-        session["running"] = False
-        session["process"] = None
-        return {"message": "Agent stopped"}
+    # Waited for outside the lock so other requests are served meanwhile
+    if process:
+        try:
+            _append_log(session, f"[{_ts()}] ⏹️ Stopping agent...")
+            if await _terminate_agent_process(process):
+                _append_log(session, f"[{_ts()}] Force killed agent")
+        except ProcessLookupError:
+            pass
+        except Exception as error:
+            raise HTTPException(status_code=500, detail=str(error)) from error
+
+    session["running"] = False
+    session["process"] = None
+    return {"message": "Agent stopped"}
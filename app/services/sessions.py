@@ -27,8 +27,10 @@ def create_session(logger, mode: str = "single") -> str:
             "current_lesson": None,
             "mode": mode,
             "logs": [],
+            "log_cursor": 0,
             "last_run": None,
             "process": None,
+            "stop_requested": False,
             "created_at": datetime.now().isoformat(),
         }
         logger.info("Session created: id=%s mode=%s", session_id, mode)
@@ -12,7 +12,7 @@ import os
 import logging
 from datetime import datetime
 from typing import List, Optional, Dict, Any
-from sqlalchemy import create_engine, Column, Integer, String, Text, Boolean, DateTime, ForeignKey, text
+from sqlalchemy import create_engine, Column, Integer, String, Text, Boolean, DateTime, ForeignKey, UniqueConstraint, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from sqlalchemy.exc import SQLAlchemyError
@@ -32,6 +32,7 @@ class User(Base):
     
     # Relationships
     questions = relationship("Question", back_populates="user", cascade="all, delete-orphan")
+    lesson_completions = relationship("LessonCompletion", back_populates="user", cascade="all, delete-orphan")
     
     def __repr__(self):
         return f"<User(email='{self.email}')>"
@@ -74,6 +75,23 @@ class Answer(Base):
         return f"<Answer(id={self.id}, text='{self.answer_text[:30]}...', selected={self.is_selected})>"
 
 
+class LessonCompletion(Base):
+    """Lesson completion model - marks lessons whose test was fully answered."""
+    __tablename__ = 'lesson_completions'
+    __table_args__ = (UniqueConstraint('user_id', 'lesson_url'),)
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False, index=True)
+    lesson_url = Column(String(500), nullable=False)
+    completed_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    user = relationship("User", back_populates="lesson_completions")
+    
+    def __repr__(self):
+        return f"<LessonCompletion(user_id={self.user_id}, lesson_url='{self.lesson_url}')>"
+
+
 class DatabaseManager:
     """Manages database connections and operations."""
     
@@ -273,6 +291,69 @@ class DatabaseManager:
         finally:
             session.close()
     
+    def mark_lesson_completed(self, user_email: str, lesson_url: str) -> bool:
+        """
+        Record that a user's test for a lesson was fully answered.
+        
+        Args:
+            user_email: User's email address
+            lesson_url: URL of the lesson
+            
+        Returns:
+            True if the lesson is recorded as completed, False otherwise
+        """
+        session = self.Session()
+        try:
+            user = session.query(User).filter_by(email=user_email).first()
+            if not user:
+                user = User(email=user_email)
+                session.add(user)
+                session.flush()  # Get the user ID
+            
+            completed = (
+                session.query(LessonCompletion.id)
+                .filter_by(user_id=user.id, lesson_url=lesson_url)
+                .first()
+            )
+            if not completed:
+                session.add(LessonCompletion(user_id=user.id, lesson_url=lesson_url))
+                session.commit()
+            return True
+            
+        except SQLAlchemyError as e:
+            logger.error(f"Error marking lesson completed: {e}")
+            session.rollback()
+            return False
+        finally:
+            session.close()
+    
+    def has_completed_lesson(self, user_email: str, lesson_url: str) -> bool:
+        """
+        Check whether a user's test for a lesson was recorded as completed.
+        
+        Args:
+            user_email: User's email address
+            lesson_url: URL of the lesson
+            
+        Returns:
+            True if mark_lesson_completed was called for the lesson
+        """
+        session = self.Session()
+        try:
+            found = (
+                session.query(LessonCompletion.id)
+                .join(User, LessonCompletion.user_id == User.id)
+                .filter(User.email == user_email, LessonCompletion.lesson_url == lesson_url)
+                .first()
+            )
+            return found is not None
+            
+        except SQLAlchemyError as e:
+            logger.error(f"Error checking lesson completion: {e}")
+            return False
+        finally:
+            session.close()
+    
     def get_question_count(self, user_email: str) -> int:
         """
         Get total number of questions for a user.
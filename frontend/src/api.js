@@ -56,9 +56,18 @@ export function getAgentStatus(sessionId) {
   return apiRequest(`/api/agent/status${qs}`);
 }
 
-export function getAgentLogs(sessionId) {
-  if (!sessionId) return Promise.resolve([]);
-  return apiRequest(`/api/agent/logs?session_id=${encodeURIComponent(sessionId)}`);
+export function getAgentLogs(sessionId, since) {
+  // With `since`, resolves to {from, to, dropped_before, lines}; pass `to` next time
+  if (!sessionId) return Promise.resolve(since === undefined ? [] : null);
+  const sinceQs = since === undefined ? "" : `&since=${since}`;
+  return apiRequest(`/api/agent/logs?session_id=${encodeURIComponent(sessionId)}${sinceQs}`);
+}
+
+export function openAgentStream(sessionId) {
+  // Server-Sent Events: one message per status change or batch of new log lines
+  return new EventSource(
+    withApiBase(`/api/agent/stream?session_id=${encodeURIComponent(sessionId)}`)
+  );
 }
 
 export function getQuestions(limit, offset) {
@@ -1,11 +1,5 @@
 import { useEffect, useMemo, useRef, useState } from "react";
-import {
-  getAgentLogs,
-  getAgentStatus,
-  startBatchAgent,
-  startSingleAgent,
-  stopAgent,
-} from "../api";
+import { openAgentStream, startBatchAgent, startSingleAgent, stopAgent } from "../api";
 
 const SESSION_KEY = "agent_session_id";
 const EMAIL_KEY = "unix_email";
@@ -32,7 +26,6 @@ export default function DashboardPage() {
   const [logs, setLogs] = useState([]);
   const [busy, setBusy] = useState(false);
   const [error, setError] = useState("");
-  const [wasRunning, setWasRunning] = useState(false);
   const logsRef = useRef(null);
   const shouldAutoScrollRef = useRef(true);
 
@@ -48,12 +41,21 @@ export default function DashboardPage() {
     unixEmail && unixPassword && batchLessonIds && !safeStatus.running && !busy;
 
   useEffect(() => {
-    const timer = window.setInterval(() => {
-      refreshStatus();
-    }, 1500);
-    refreshStatus();
-    return () => window.clearInterval(timer);
-  }, [sessionId, wasRunning]);
+    if (!sessionId) return undefined;
+    const source = openAgentStream(sessionId);
+    // Every (re)connect starts with all lines the server still keeps
+    source.onopen = () => setLogs([]);
+    source.onmessage = (event) => {
+      const { status, new_logs: newLogs } = JSON.parse(event.data);
+      setAgentStatus(status);
+      if (newLogs.length) {
+        setLogs((current) => [...current, ...newLogs]);
+      }
+    };
+    // Sent once the session stopped; closing keeps EventSource from reconnecting
+    source.addEventListener("end", () => source.close());
+    return () => source.close();
+  }, [sessionId]);
 
   useEffect(() => {
     if (logsRef.current && shouldAutoScrollRef.current) {
@@ -70,28 +72,6 @@ export default function DashboardPage() {
     shouldAutoScrollRef.current = distanceToBottom < 24;
   }
 
-  async function refreshStatus() {
-    try {
-      const status = await getAgentStatus(sessionId);
-      const normalizedStatus = status || {
-        running: false,
-        current_lesson: null,
-        last_run: null,
-        log_count: 0,
-      };
-      setAgentStatus(normalizedStatus);
-      if ((normalizedStatus.running || normalizedStatus.log_count > 0) && sessionId) {
-        const lines = await getAgentLogs(sessionId);
-        setLogs(lines);
-      }
-      if (wasRunning && !normalizedStatus.running) {
-        setWasRunning(false);
-      }
-    } catch (e) {
-      setError(e.message);
-    }
-  }
-
   async function tryStoreCredentials() {
     try {
       if ("credentials" in navigator && "PasswordCredential" in window) {
@@ -122,10 +102,10 @@ export default function DashboardPage() {
       });
       setSessionId(data.session_id);
       localStorage.setItem(SESSION_KEY, data.session_id);
-      setWasRunning(true);
+      // Shown as running until the stream for the new session reports in
+      setAgentStatus((current) => ({ ...current, running: true }));
       shouldAutoScrollRef.current = true;
       setLogs([]);
-      await refreshStatus();
     } catch (e) {
       setError(e.message);
     } finally {
@@ -148,10 +128,10 @@ export default function DashboardPage() {
       });
       setSessionId(data.session_id);
       localStorage.setItem(SESSION_KEY, data.session_id);
-      setWasRunning(true);
+      // Shown as running until the stream for the new session reports in
+      setAgentStatus((current) => ({ ...current, running: true }));
       shouldAutoScrollRef.current = true;
       setLogs([]);
-      await refreshStatus();
     } catch (e) {
       setError(e.message);
     } finally {
@@ -165,7 +145,6 @@ export default function DashboardPage() {
     setError("");
     try {
       await stopAgent(sessionId);
-      await refreshStatus();
     } catch (e) {
       setError(e.message);
     } finally {
@@ -9,39 +9,584 @@ This agent automates the process of:
 """
 
 import os
+import re
+import json
+import hashlib
 import time
+import queue
+import tempfile
+import random
+import shutil
+import atexit
 import logging
+import threading
+import multiprocessing.util
 import argparse
+try:
+    import fcntl
+except ImportError:  # Windows: concurrent cookie saves are not locked
+    fcntl = None
+from logging.handlers import QueueHandler, QueueListener
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 from selenium import webdriver
 from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, ElementClickInterceptedException
-from selenium.webdriver.common.action_chains import ActionChains
+from selenium.common.exceptions import (
+    TimeoutException,
+    NoSuchElementException,
+    ElementClickInterceptedException,
+    StaleElementReferenceException,
+    WebDriverException,
+)
 
 from ai_helper import AIHelper
 from db_models import DatabaseManager
 
+
+def _setup_logging():
+    """Configure logging through a queue.
+    
+    Records are only enqueued by the caller; a background listener thread
+    writes them to unix_agent.log and the console, so file I/O stays out of
+    the polling and answering loops.
+    
+    Returns:
+        The started QueueListener
+    """
+    log_queue = queue.Queue(-1)
+    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+    handlers = [logging.FileHandler("unix_agent.log"), logging.StreamHandler()]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    logging.basicConfig(level=logging.INFO, handlers=[QueueHandler(log_queue)], force=True)
+    return listener
+
+
+def _setup_worker_logging():
+    """Pool worker initializer: forked workers do not inherit the log listener thread."""
+    listener = _setup_logging()
+    # Workers exit through multiprocessing's exit hooks, not atexit; flush the
+    # queued records there, after the browser is closed (exitpriority 10)
+    multiprocessing.util.Finalize(None, listener.stop, exitpriority=0)
+
+
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("unix_agent.log"),
-        logging.StreamHandler()
-    ]
-)
+_setup_logging()
 logger = logging.getLogger(__name__)
 
+# Chrome command line: anti-detection arguments
+_CHROME_ARGS = (
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--window-size=1920,1080",
+    "--start-maximized",
+    "--disable-blink-features=AutomationControlled",
+    "--disable-web-security",
+    "--disable-features=IsolateOrigins,site-per-process",
+    "--disable-gpu",
+    "--disable-software-rasterizer",
+    "--mute-audio",  # Mute all audio in the browser
+    # Keep videos playing in background tabs (see process_lessons_in_tabs)
+    "--disable-background-media-suspend",
+    "--disable-background-timer-throttling",
+    "--disable-renderer-backgrounding",
+    # User agent - use a real Chrome user agent
+    "user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/144.0.0.0 Safari/537.36",
+)
+
+_CHROME_EXPERIMENTAL_OPTIONS = (
+    ("excludeSwitches", ["enable-automation", "enable-logging"]),
+    ("useAutomationExtension", False),
+    ("prefs", {
+        "profile.default_content_setting_values.notifications": 2,
+        "credentials_enable_service": False,
+        "profile.password_manager_enabled": False
+    }),
+)
+
+# Injected before any page script runs to hide the webdriver flag
+_STEALTH_JS = """
+    Object.defineProperty(navigator, 'webdriver', {
+        get: () => undefined
+    });
+    
+    // Overwrite the `plugins` property to use a custom getter.
+    Object.defineProperty(navigator, 'plugins', {
+        get: () => [1, 2, 3, 4, 5]
+    });
+    
+    // Overwrite the `languages` property to use a custom getter.
+    Object.defineProperty(navigator, 'languages', {
+        get: () => ['en-US', 'en']
+    });
+    
+    // Pass the Chrome Test.
+    window.chrome = {
+        runtime: {}
+    };
+    
+    // Pass the Permissions Test.
+    const originalQuery = window.navigator.permissions.query;
+    window.navigator.permissions.query = (parameters) => (
+        parameters.name === 'notifications' ?
+            Promise.resolve({ state: Notification.permission }) :
+            originalQuery(parameters)
+    );
+"""
+
+# Question detection patterns, compiled once instead of per element/question
+_QUESTION_PREFIX_RE = re.compile(r'^(\d+)\.')
+_QUESTION_FULL_RE = re.compile(r'\d+\.\s*[A-ZА-Яa-zа-я].{20,}[\?\.]')
+_QUESTION_NUMBER_STRIP_RE = re.compile(r'^\s*\d+\.\s*')
+_QUESTION_START_RE = re.compile(r'\d+\.\s*[A-ZА-Яa-zа-я].{20,}')
+_TEST_OPEN_RE = re.compile(r'time for the test|время на тест', re.I)
+
+# Keys that hold question/option text and option lists in embedded SPA state
+_STATE_TEXT_KEYS = ("question_text", "question", "text", "title", "name", "value", "answer")
+_STATE_OPTION_KEYS = ("answers", "options", "variants", "choices")
+
+# CSS selectors reused across questions
+_CURSOR_POINTER_CSS = "div.cursor-pointer"
+# Answer option divs, most specific first (per inspect.html: div.bg-gray-cool with p.ml-4)
+_OPTION_DIV_SELECTORS = (
+    "div.cursor-pointer.bg-gray-cool",
+    "div.cursor-pointer[class*='rounded-[24px]']",
+    _CURSOR_POINTER_CSS,
+)
+
+# Button text patterns, one alternation scan per text instead of a substring
+# search per keyword (same keywords and substring matching as before)
+_SUBMIT_KW = re.compile(r'finish|send|submit|complete|завершить|отправить|end', re.I)
+_TEST_KW = re.compile(r'test|тест', re.I)
+_SIGN_IN_KW = re.compile(r'sign in|войти|login', re.I)
+
+# First visible, enabled "Next" button under arguments[0] (or the document),
+# matched in the browser in one call; arguments[1] holds the lowercased keywords
+_NEXT_KEYWORDS = ("next", "далее", "следующий")
+_FIND_NEXT_BUTTON_JS = """
+    const root = arguments[0] || document, keywords = arguments[1];
+    return Array.from(root.querySelectorAll('button:not([disabled])')).find(b => {
+        const text = (b.innerText || '').toLowerCase();
+        return b.getClientRects().length > 0 && keywords.some(kw => text.includes(kw));
+    }) || null;
+"""
+
+# Backoff (seconds) between re-finding and re-clicking an element that went stale
+_STALE_RETRY_DELAYS = (0.1, 0.2, 0.4)
+
+# Lowercased button/element text keywords, built once instead of per element
+_NAV_KEYWORDS = ("next", "back", "submit", "start", "finish", "restart")
+_OPTION_SKIP_KEYWORDS = _NAV_KEYWORDS + ("question", "timer", "deadline", "ответьте на все", "answer all")
+_FALLBACK_SKIP_KEYWORDS = ("next", "back", "submit", "start", "finish", "question", "time", "ответьте на все", "answer all")
+
+# Click an answer option in the browser: the option itself, then the visual
+# radio circle, then the p tag. Returns which target was clicked, or null.
+_CLICK_CASCADE_JS = """
+    const el = arguments[0];
+    try { el.click(); return 'option'; } catch (e) {}
+    const circle = el.querySelector("div[class*='rounded-full']");
+    if (circle) { try { circle.click(); return 'inner circle'; } catch (e) {} }
+    const p = el.querySelector('p');
+    if (p) { try { p.click(); return 'p tag'; } catch (e) {} }
+    return null;
+"""
+
+# Re-find an option under arguments[0] by its exact text together with its
+# inner radio circle and p tag, then click the first target that accepts it
+_RETRY_CLICK_JS = """
+    const [root, text] = arguments;
+    const pairs = Array.from(root.querySelectorAll('div.cursor-pointer')).map(d => [
+        d, d.querySelector("div[class*='rounded-full']"), d.querySelector('p')
+    ]);
+    const names = ['option', 'inner circle', 'p tag'];
+    for (const targets of pairs) {
+        if ((targets[0].innerText || '').trim() !== text) continue;
+        for (let i = 0; i < targets.length; i++) {
+            if (!targets[i]) continue;
+            try { targets[i].click(); return names[i]; } catch (e) {}
+        }
+    }
+    return null;
+"""
+
+# Click the question number button arguments[0] and return which lookup found it:
+# 1. question number buttons - rounded-[100%] divs (per inspect.html)
+# 2. a displayed one inside the overflow-x-auto questions area
+# 3. fallback - any short cursor-pointer div with the number, excluding
+#    answer options (px-6 = options)
+_NAVIGATE_TO_QUESTION_JS = """
+    const num = arguments[0];
+    const text = e => (e.innerText || '').trim();
+    const click = (e, method) => { e.click(); return method; };
+    let el = [...document.querySelectorAll("div.cursor-pointer[class*='rounded-[100%]']")].find(e => text(e) === num);
+    if (el) return click(el, 'button');
+    el = [...document.querySelectorAll("div.overflow-x-auto div.cursor-pointer[class*='rounded-[100%]']")]
+        .find(e => text(e) === num && e.getClientRects().length > 0);
+    if (el) return click(el, 'questions area');
+    el = [...document.querySelectorAll('div.cursor-pointer')].find(e => {
+        const cls = e.getAttribute('class') || '';
+        return text(e) === num && num.length <= 2 &&
+            (cls.includes('rounded-[100%]') || (cls.includes('rounded-full') && !cls.includes('px-6')));
+    });
+    if (el) return click(el, 'fallback');
+    return null;
+"""
+
+# Find the cursor-pointer div under arguments[0] whose whitespace-normalized
+# text equals arguments[1], else the first one containing the prefix arguments[2]
+_MATCH_OPTION_TEXT_JS = """
+    const [root, text, prefix] = arguments;
+    let partial = null;
+    for (const div of root.querySelectorAll('div.cursor-pointer')) {
+        const divText = (div.textContent || '').replace(/\\s+/g, ' ').trim();
+        if (divText === text) return div;
+        if (!partial && divText.includes(prefix)) partial = div;
+    }
+    return partial;
+"""
+
+# Defines questionText(), the numbered text ("3. What ...") of the question in
+# the content column; questionNumber(), its number; and questionIdentity(), the
+# question's data-question-id, else its text. Each is null while no question is
+# rendered; timers and header text outside the question never change them.
+_QUESTION_FNS = """
+    function questionText() {
+        const grid = document.querySelector('.grid.grid-cols-12');
+        const column = grid && Array.from(grid.children).find(child =>
+            child.tagName === 'DIV' && !(child.getAttribute('class') || '').includes('col-span-4'));
+        for (const e of (column || document.body).querySelectorAll('p, h1, h2, h3')) {
+            const text = (e.innerText || '').trim();
+            if (/^\\d+\\.\\s*\\S/.test(text)) return text;
+        }
+        return null;
+    }
+    function questionNumber() {
+        const text = questionText();
+        return text === null ? null : parseInt(text, 10);
+    }
+    function questionIdentity() {
+        const q = document.querySelector('[data-question-id]');
+        return q ? q.dataset.questionId : questionText();
+    }
+"""
+
+# Identity of the question on screen, used to detect auto-advancing quizzes
+_QUESTION_SIGNATURE_JS = _QUESTION_FNS + "return questionIdentity();"
+
+# Set an input's value through the native setter (so React's value tracker
+# sees the change) and fire the events frameworks listen for
+_SET_INPUT_JS = """
+    const el = arguments[0], value = arguments[1];
+    const setter = Object.getOwnPropertyDescriptor(window.HTMLInputElement.prototype, 'value').set;
+    setter.call(el, value);
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    el.dispatchEvent(new Event('change', {bubbles: true}));
+"""
+
+# Every button matching arguments[0] with its text and state, read in one call
+# instead of .text/.is_displayed()/.is_enabled() round trips per button
+_ENUMERATE_BUTTONS_JS = """
+    return Array.from(document.querySelectorAll(arguments[0])).map(b => {
+        const r = b.getBoundingClientRect();
+        return {
+            element: b,
+            text: (b.innerText || '').trim(),
+            visible: r.width > 0 && r.height > 0 && getComputedStyle(b).visibility !== 'hidden',
+            enabled: !b.disabled,
+        };
+    });
+"""
+
+# Mark the video as done in window.__videoDone from its own events and wake up
+# any waiter registered by _WAIT_VIDEO_DONE_JS
+_VIDEO_DONE_LISTENER_JS = """
+    const v = arguments[0];
+    window.__videoDone = false;
+    window.__videoDoneWaiters = [];
+    const markDone = () => {
+        if (window.__videoDone) return;
+        window.__videoDone = true;
+        window.__videoDoneWaiters.splice(0).forEach(wake => wake());
+    };
+    v.addEventListener('ended', markDone);
+    v.addEventListener('timeupdate', () => {
+        if (v.duration && v.currentTime >= v.duration - 0.5) markDone();
+    });
+"""
+
+# Async script that returns true as soon as the video is done, or false after
+# arguments[0] ms - the browser answers the pending call, nothing is polled
+_WAIT_VIDEO_DONE_JS = """
+    const ms = arguments[0], done = arguments[arguments.length - 1];
+    if (window.__videoDone) { done(true); return; }
+    const timer = setTimeout(() => done(false), ms);
+    // Without the listener (e.g. an iframe player) this is just a pause
+    if (window.__videoDoneWaiters) {
+        window.__videoDoneWaiters.push(() => { clearTimeout(timer); done(true); });
+    }
+"""
+
+# Third-party analytics/telemetry requests blocked in the browser; they only
+# compete with the page for the main thread between clicks
+_BLOCKED_URL_PATTERNS = [
+    "*google-analytics*",
+    "*googletagmanager*",
+    "*segment.io*",
+    "*mixpanel*",
+    "*hotjar*",
+    "*sentry.io*",
+    "*facebook.net*",
+    "*doubleclick*",
+    "*/analytics/*",
+]
+
+# Images and web fonts are not needed to read questions or play the video
+# (video streams are not matched); still loaded when debug screenshots are on
+_BLOCKED_ASSET_PATTERNS = [
+    "*.png",
+    "*.jpg",
+    "*.jpeg",
+    "*.gif",
+    "*.webp",
+    "*.svg",
+    "*.woff",
+    "*.woff2",
+    "*.ttf",
+    "*.otf",
+]
+
+# Chrome prefs that stop images being loaded at all (not only the blocked URLs)
+_NO_IMAGES_PREFS = {"profile.managed_default_content_settings.images": 2}
+
+# "missing" for a 404 page or a redirect away from the lesson, "error" for
+# another error page (possibly transient), "found" once the lesson grid
+# rendered, null while still loading; URL and title are checked first and only
+# the rendered text (not the page source) is searched
+_LESSON_PAGE_STATE_JS = """
+    if (!location.pathname.includes('/platform/lessons/')) return 'missing';
+    const title = document.title.toLowerCase();
+    if (title.includes('404')) return 'missing';
+    if (title.includes('error')) return 'error';
+    const text = document.body ? (document.body.innerText || '').toLowerCase() : '';
+    if (text.includes('404') || text.includes('not found')) return 'missing';
+    return document.querySelector('.grid.grid-cols-12') ? 'found' : null;
+"""
+
+# Method 1 of the option scan: radio/checkbox inputs under arguments[0], with
+# their text taken from the input's parent, or its label, as [text, element]
+_RADIO_OPTIONS_JS = """
+    const ctx = arguments[0], found = [];
+    for (const input of ctx.querySelectorAll("input[type='radio'], input[type='checkbox']")) {
+        const parent = input.parentElement;
+        const text = parent ? (parent.innerText || '').trim() : '';
+        if (text) {
+            found.push([text, parent]);
+        } else if (input.id) {
+            const label = ctx.querySelector(`label[for='${CSS.escape(input.id)}']`);
+            const labelText = label ? (label.innerText || '').trim() : '';
+            if (labelText) found.push([labelText, label]);
+        }
+    }
+    return found;
+"""
+
+# Method 3 of the option scan: any div that might be an option, filtered in the
+# browser; arguments[1] holds the lowercased keywords to skip
+_FALLBACK_OPTIONS_JS = """
+    const ctx = arguments[0], skipKeywords = arguments[1];
+    const seen = new Set(), found = [];
+    // Class filter applied by the selector engine, not per div in JS
+    const selector = "div[class*='cursor'], div[class*='rounded'], div[class*='bg-gray-cool'], div[class*='text-unix']";
+    for (const div of ctx.querySelectorAll(selector)) {
+        const text = (div.innerText || '').trim();
+        if (text.length <= 1 || text.length >= 100 || text.includes('\\n')) continue;
+        // Skip question numbers like "1" or "2."
+        if (text.length <= 3 && /^\\d(\\d*|\\d*\\.)$/.test(text)) continue;
+        const lower = text.toLowerCase();
+        if (skipKeywords.some(kw => lower.includes(kw)) || seen.has(text)) continue;
+        seen.add(text);
+        found.push([text, div]);
+        // Only the first 6 options are kept below
+        if (found.length >= 6) break;
+    }
+    return found;
+"""
+
+# Lesson title (first 100 chars) read in the browser in one call, or null; the
+# h1 usually wins and is looked up by tag before the attribute-contains selector
+_LESSON_TITLE_JS = """
+    const el = document.getElementsByTagName('h1')[0]
+        || document.querySelector(".lesson-title, [class*='title']");
+    const title = el ? (el.innerText || '').trim() : '';
+    return title ? title.slice(0, 100) : null;
+"""
+
+# Separator line around the per-lesson log banners of the batch modes
+_BANNER = "=" * 50
+
+# Seconds an execute_async_script call may run before the driver gives up
+_SCRIPT_TIMEOUT = 30
+
+# Resolved chromedriver path, shared by every driver started in this process
+_CACHED_DRIVER_PATH = None
+
+
+def _get_chromedriver_path() -> str:
+    """Resolve the chromedriver path once per process.
+    
+    CHROMEDRIVER_PATH skips webdriver-manager entirely; CHROMEDRIVER_VERSION pins
+    the driver version so no "latest release" lookup is made on startup.
+    """
+    global _CACHED_DRIVER_PATH
+    if _CACHED_DRIVER_PATH is None:
+        driver_path = os.getenv("CHROMEDRIVER_PATH")
+        if not driver_path:
+            # Keep webdriver-manager quiet and its driver cache next to the project
+            os.environ.setdefault("WDM_LOG", "0")
+            os.environ.setdefault("WDM_LOCAL", "1")
+            driver_version = os.getenv("CHROMEDRIVER_VERSION")
+            manager = ChromeDriverManager(driver_version=driver_version) if driver_version else ChromeDriverManager()
+            driver_path = manager.install()
+        _CACHED_DRIVER_PATH = driver_path
+    return _CACHED_DRIVER_PATH
+
+
+def _contains_any(text: str, keywords: tuple) -> bool:
+    """Return True if any keyword occurs in text (a plain loop, no generator per call)."""
+    for kw in keywords:
+        if kw in text:
+            return True
+    return False
+
+
+def _normalize_question(text: str) -> str:
+    """Normalize question text for matching: drop the "N." prefix, case and extra spaces."""
+    return " ".join(_QUESTION_NUMBER_STRIP_RE.sub("", text).split()).lower()
+
+
+def _default_profile_dir(email: str) -> str | None:
+    """Return the persistent Chrome profile directory for an account.
+    
+    Opt-in through CHROME_PROFILE_DIR (the base directory): Chrome locks a
+    profile, so two runs for the same account at once cannot share one.
+    Unset, every run starts with a fresh profile.
+    """
+    base_dir = os.getenv("CHROME_PROFILE_DIR", "")
+    if not base_dir:
+        return None
+    account = hashlib.blake2b(email.lower().encode("utf-8"), digest_size=8).hexdigest()
+    return os.path.join(os.path.expanduser(base_dir), account)
+
+
+def _cookies_file() -> str | None:
+    """Return the file login cookies are kept in between browsers (UNIX_COOKIES_FILE, empty disables)."""
+    path = os.getenv("UNIX_COOKIES_FILE", "~/.unix_agent_cookies.json")
+    return os.path.expanduser(path) if path else None
+
+
+def _log_db_save_result(future):
+    """Log the outcome of a background save_question_with_answers call."""
+    try:
+        if future.result():
+            logger.info("Question and answers saved to database")
+        else:
+            logger.warning("Failed to save question to database")
+    except Exception as e:
+        logger.error(f"Error saving to database: {e}")
+
+
+def _batch_checkpoint_file() -> str | None:
+    """Return the file the sequential batch progress is kept in (UNIX_BATCH_CHECKPOINT, empty disables)."""
+    path = os.getenv("UNIX_BATCH_CHECKPOINT", "~/.unix_agent_batch_checkpoint.json")
+    return os.path.expanduser(path) if path else None
+
+
+def _load_batch_checkpoint(email: str, start_id: int) -> int | None:
+    """Return the last lesson ID finished by an interrupted batch with the same account and start ID."""
+    path = _batch_checkpoint_file()
+    if not path:
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if checkpoint.get("email") != email.lower() or checkpoint.get("start_id") != start_id:
+        return None
+    return checkpoint.get("last_id")
+
+
+def _save_batch_checkpoint(email: str, start_id: int, last_id: int | None):
+    """Record the last finished lesson ID of a batch (None clears the checkpoint)."""
+    path = _batch_checkpoint_file()
+    if not path:
+        return
+    try:
+        if last_id is None:
+            if os.path.exists(path):
+                os.remove(path)
+            return
+        # Written to a temp file and swapped in so a crash never leaves half a file
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"email": email.lower(), "start_id": start_id, "last_id": last_id}, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.debug(f"Could not write batch checkpoint: {e}")
+
+
+def _answer_cache_key(question: str, options: list[str]) -> str:
+    """Hash a question and its options (in any order) into an answer cache key."""
+    text = f"{_normalize_question(question)}||{'|'.join(sorted(options))}"
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _state_text(node) -> str | None:
+    """Return the display text of a question/option node from SPA state."""
+    if isinstance(node, str):
+        return node.strip() or None
+    if isinstance(node, dict):
+        for key in _STATE_TEXT_KEYS:
+            value = node.get(key)
+            if isinstance(value, str) and value.strip():
+                return value.strip()
+    return None
+
+
+def _extract_state_questions(state) -> list[tuple[str, list[str]]]:
+    """Find (question, options) pairs anywhere in an embedded SPA state payload."""
+    found = []
+    stack = [state]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            option_nodes = next((node[k] for k in _STATE_OPTION_KEYS if isinstance(node.get(k), list)), None)
+            question = _state_text(node) if option_nodes else None
+            if question:
+                options = [text for text in map(_state_text, option_nodes) if text]
+                if len(options) >= 2:
+                    found.append((question, options))
+                    continue
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return found
+
 
 class UniXAgent:
     """Agent for automating UniX platform lecture viewing and test completion."""
     
     BASE_URL = "https://uni-x.almv.kz"
     LESSONS_URL = f"{BASE_URL}/platform/lessons"
+    LESSON_URL = LESSONS_URL + "/{}"  # .format(lesson_id)
     
     def __init__(self, email: str, password: str, headless: bool = False):
         """
@@ -57,19 +602,43 @@ class UniXAgent:
         self.headless = headless
         self.driver = None
         self.wait = None
+        self.wait_short = None
+        self.wait_med = None
+        self.wait_long = None
         self.ai_helper = None
         self.db_manager = None
         self.current_lesson_name = None  # Track current lesson for context
         self.current_lesson_url = None
-        self.save_debug_artifacts = os.getenv("SAVE_DEBUG_ARTIFACTS", "false").strip().lower() in {
+        self._prefetched_answers = {}  # normalized question text -> chosen option text
+        self._answer_cache: dict[str, str] = {}  # question+options hash -> chosen option text
+        self._option_method = None  # precise option scan method that last found options
+        # Database writes run here so they overlap the answer click; one
+        # thread keeps them in order
+        self._io_pool = ThreadPoolExecutor(max_workers=1)
+        # Chrome profile kept between runs so the login cookie survives, if
+        # CHROME_PROFILE_DIR is set; pool workers get a temporary one instead
+        self.user_data_dir = _default_profile_dir(email)
+        self._last_page_source = None  # page source reused by back-to-back debug dumps
+        self._debug_snapshot_ts = 0.0
+        save_debug_artifacts = os.getenv("SAVE_DEBUG_ARTIFACTS", "false").strip().lower()
+        self.save_debug_artifacts = save_debug_artifacts in {
             "1",
             "true",
             "yes",
             "on",
         }
+        # "errors" keeps only the dumps taken on failures, not the happy-path ones
+        self.save_failure_artifacts = self.save_debug_artifacts or save_debug_artifacts == "errors"
         
     def setup_driver(self):
-        """Set up the Chrome WebDriver with anti-detection measures."""
+        """Set up the Chrome WebDriver with anti-detection measures.
+        
+        A driver that is already running is kept, so the browser (and its
+        login) is started once per agent however often setup runs.
+        """
+        if self.driver is not None:
+            logger.debug("WebDriver already running, reusing it")
+            return
         options = webdriver.ChromeOptions()
         
         # Check if running on Railway/Docker (system Chrome available)
@@ -85,31 +654,22 @@ class UniXAgent:
             options.add_argument("--headless=new")  # Use new headless mode
         
         # Anti-detection arguments
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--window-size=1920,1080")
-        options.add_argument("--start-maximized")
-        options.add_argument("--disable-blink-features=AutomationControlled")
-        options.add_argument("--disable-web-security")
-        options.add_argument("--disable-features=IsolateOrigins,site-per-process")
-        options.add_argument("--disable-gpu")
-        options.add_argument("--disable-software-rasterizer")
-        options.add_argument("--mute-audio")  # Mute all audio in the browser
-        
-        # User agent - use a real Chrome user agent
-        options.add_argument("user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/144.0.0.0 Safari/537.36")
-        
-        # Exclude automation flags
-        options.add_experimental_option("excludeSwitches", ["enable-automation", "enable-logging"])
-        options.add_experimental_option("useAutomationExtension", False)
-        
-        # Additional preferences
-        prefs = {
-            "profile.default_content_setting_values.notifications": 2,
-            "credentials_enable_service": False,
-            "profile.password_manager_enabled": False
-        }
-        options.add_experimental_option("prefs", prefs)
+        if self.user_data_dir:
+            os.makedirs(self.user_data_dir, exist_ok=True)
+            options.add_argument(f"--user-data-dir={self.user_data_dir}")
+        for arg in _CHROME_ARGS:
+            options.add_argument(arg)
+        
+        # Exclude automation flags, additional preferences
+        for name, value in _CHROME_EXPERIMENTAL_OPTIONS:
+            if name == "prefs" and not self.save_debug_artifacts:
+                # Images are never needed to find questions; skip decoding them
+                value = {**value, **_NO_IMAGES_PREFS}
+            options.add_experimental_option(name, value)
+        
+        # driver.get() returns once the DOM is parsed; waits for the elements
+        # that are actually needed happen in _wait_ready and the callers
+        options.page_load_strategy = "eager"
         
         # Use system Chrome on Railway/Docker, otherwise use webdriver-manager
         if is_railway:
@@ -123,46 +683,35 @@ class UniXAgent:
             )
         else:
             self.driver = webdriver.Chrome(
-                service=ChromeService(ChromeDriverManager().install()),
+                service=ChromeService(_get_chromedriver_path()),
                 options=options
             )
         
-        # Set page load timeout to 60 seconds (default is too short sometimes)
-        self.driver.set_page_load_timeout(60)
+        # With the eager strategy driver.get() returns at DOMContentLoaded, so a
+        # page that has not got there in 24s is stuck; the waits after it are
+        # the real readiness gate. Async scripts (video/question waits) run in
+        # slices below the script timeout.
+        self.driver.set_page_load_timeout(24)
+        self.driver.set_script_timeout(_SCRIPT_TIMEOUT)
         
         # Execute CDP commands to hide webdriver flag
-        self.driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {
-            "source": """
-                Object.defineProperty(navigator, 'webdriver', {
-                    get: () => undefined
-                });
-                
-                // Overwrite the `plugins` property to use a custom getter.
-                Object.defineProperty(navigator, 'plugins', {
-                    get: () => [1, 2, 3, 4, 5]
-                });
-                
-                // Overwrite the `languages` property to use a custom getter.
-                Object.defineProperty(navigator, 'languages', {
-                    get: () => ['en-US', 'en']
-                });
-                
-                // Pass the Chrome Test.
-                window.chrome = {
-                    runtime: {}
-                };
-                
-                // Pass the Permissions Test.
-                const originalQuery = window.navigator.permissions.query;
-                window.navigator.permissions.query = (parameters) => (
-                    parameters.name === 'notifications' ?
-                        Promise.resolve({ state: Notification.permission }) :
-                        originalQuery(parameters)
-                );
-            """
-        })
+        self.driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": _STEALTH_JS})
         
-        self.wait = WebDriverWait(self.driver, 30)
+        # Block analytics/telemetry requests, and images/fonts unless debugging
+        blocked_urls = list(_BLOCKED_URL_PATTERNS)
+        if not self.save_debug_artifacts:
+            blocked_urls += _BLOCKED_ASSET_PATTERNS
+        try:
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_urls})
+        except Exception as e:
+            logger.warning(f"Could not set blocked URLs: {e}")
+        
+        # Shared waits: fast polling for short conditions, slower for long ones
+        self.wait_short = WebDriverWait(self.driver, 5, poll_frequency=0.1)
+        self.wait_med = WebDriverWait(self.driver, 15, poll_frequency=0.2)
+        self.wait_long = WebDriverWait(self.driver, 30, poll_frequency=0.5)
+        self.wait = self.wait_long
         logger.info("WebDriver initialized successfully with anti-detection")
         
     def setup_ai(self):
@@ -174,6 +723,26 @@ class UniXAgent:
             logger.warning(f"AI Helper not available: {e}")
             logger.warning("Tests will require manual intervention")
     
+    def setup(self, ai: bool = True, database: bool = True):
+        """
+        Set up the driver, AI helper and database concurrently.
+        
+        None of them depends on another, so AI client and database connection
+        setup are hidden under the browser startup.
+        
+        Args:
+            ai: Also initialize the AI helper
+            database: Also initialize the database connection
+        """
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [executor.submit(self.setup_driver)]
+            if ai:
+                futures.append(executor.submit(self.setup_ai))
+            if database:
+                futures.append(executor.submit(self.setup_database))
+            for future in futures:
+                future.result()
+    
     def setup_database(self):
         """Initialize the database connection for storing questions/answers."""
         try:
@@ -202,6 +771,24 @@ class UniXAgent:
         """
         LOGIN_URL = f"{self.BASE_URL}/platform/login"
         
+        # A session kept in the browser profile or in saved cookies skips the
+        # login form entirely
+        restored = self._restore_cookies()
+        try:
+            self.driver.get(self.LESSONS_URL)
+            self._wait_ready()
+            # Wait for the SPA to either redirect to the login page or render
+            # the logged-in layout; a timeout falls through to the login form
+            WebDriverWait(self.driver, 5, poll_frequency=0.2).until(
+                lambda d: "/platform/login" in d.current_url or self._is_logged_in()
+            )
+            if "/platform/login" not in self.driver.current_url and self._is_logged_in():
+                source = "saved cookies" if restored else "browser profile"
+                logger.info(f"Already logged in (session restored from {source})")
+                return True
+        except Exception as e:
+            logger.debug(f"No saved session: {e}")
+        
         logger.info(f"Navigating to login page: {LOGIN_URL}")
         
         # Retry logic for initial page load
@@ -221,12 +808,20 @@ class UniXAgent:
                     return False
         
         try:
-            # Wait for page to load
-            time.sleep(3)
+            # Wait for the page to load and either show the form or redirect
+            self._wait_ready()
+            try:
+                self.wait_med.until(
+                    lambda d: "/platform/login" not in d.current_url
+                    or d.find_elements(By.CSS_SELECTOR, "input[type='email']")
+                )
+            except TimeoutException:
+                pass
             
             # Check if already logged in (redirected away from login)
             if "/platform/login" not in self.driver.current_url:
                 logger.info("Already logged in (redirected from login page)")
+                self._save_cookies()
                 return True
             
             logger.info("Looking for login elements...")
@@ -238,7 +833,7 @@ class UniXAgent:
                 )
             except TimeoutException:
                 logger.error("Could not find email input field")
-                self._save_debug_info("login_no_email")
+                self._save_debug_info("login_no_email", failure=True)
                 return False
             
             # Find password field
@@ -246,13 +841,8 @@ class UniXAgent:
             
             # Enter credentials
             logger.info("Entering credentials...")
-            email_input.clear()
-            email_input.send_keys(self.email)
-            time.sleep(0.3)
-            
-            password_input.clear()
-            password_input.send_keys(self.password)
-            time.sleep(0.3)
+            self._set_input(email_input, self.email)
+            self._set_input(password_input, self.password)
             
             # Find the "Sign in" button - it's a button[type='submit'] with class containing 'platform-auth-button'
             login_button = None
@@ -265,36 +855,36 @@ class UniXAgent:
             
             # Fallback: find button with "Sign in" text
             if not login_button:
-                buttons = self.driver.find_elements(By.TAG_NAME, "button")
-                for btn in buttons:
-                    text = btn.text.lower().strip()
-                    if 'sign in' in text or 'войти' in text or 'login' in text:
-                        login_button = btn
+                for btn in self._enumerate_buttons():
+                    if _SIGN_IN_KW.search(btn["text"]):
+                        login_button = btn["element"]
                         break
             
             if login_button:
-                logger.info(f"Clicking login button: '{login_button.text}'")
-                # Use JavaScript click for reliability
-                self.driver.execute_script("arguments[0].click();", login_button)
+                # Use JavaScript click for reliability; the label comes back from
+                # the same call instead of a separate .text read
+                label = self.driver.execute_script(
+                    "const b = arguments[0]; b.click(); return (b.innerText || '').trim();", login_button
+                )
+                logger.info(f"Clicked login button: '{label}'")
             else:
                 # Fallback: submit form via Enter key
                 logger.info("No button found, trying Enter key...")
-                from selenium.webdriver.common.keys import Keys
                 password_input.send_keys(Keys.RETURN)
             
             # Wait for redirect to lessons page
             logger.info("Waiting for login to complete...")
             try:
                 # Wait for URL to change from login page
-                WebDriverWait(self.driver, 15).until(
+                self.wait_med.until(
                     lambda d: "/platform/login" not in d.current_url
                 )
                 logger.info(f"Redirected to: {self.driver.current_url}")
             except TimeoutException:
                 logger.warning("No redirect detected, checking page state...")
             
-            # Give extra time for page to stabilize
-            time.sleep(2)
+            # Let the redirected page finish loading
+            self._wait_ready()
             
             # Verify login by checking current URL
             current_url = self.driver.current_url
@@ -302,50 +892,196 @@ class UniXAgent:
             
             if "/platform/login" not in current_url:
                 logger.info("Login successful! (redirected from login page)")
+                self._save_cookies()
                 return True
             
             # Still on login page - check for error messages
             error_elements = self.driver.find_elements(By.CSS_SELECTOR, "[class*='error'], [class*='alert'], .text-red-500")
-            for elem in error_elements:
-                if elem.text.strip():
-                    logger.error(f"Login error message: {elem.text}")
+            for text in self._element_texts(error_elements):
+                if text:
+                    logger.error(f"Login error message: {text}")
             
             logger.error("Login failed - still on login page")
-            self._save_debug_info("login_failed")
+            self._save_debug_info("login_failed", failure=True)
             return False
                 
         except Exception as e:
             logger.error(f"Login error: {e}")
-            self._save_debug_info("login_error")
+            self._save_debug_info("login_error", failure=True)
             return False
 
     
+    def _save_cookies(self):
+        """Save this account's session cookies so new browsers can skip the login form."""
+        path = _cookies_file()
+        if not path:
+            return
+        try:
+            cookies = self.driver.get_cookies()
+            # Pool workers and concurrent sessions save at the same time: merge
+            # under a lock, and swap the new file in whole so no other account's
+            # entry is lost and no reader ever sees half a file
+            with open(f"{path}.lock", "a") as lock:
+                if fcntl:
+                    fcntl.flock(lock, fcntl.LOCK_EX)
+                try:
+                    with open(path, encoding="utf-8") as f:
+                        saved = json.load(f)
+                except (OSError, ValueError):
+                    saved = {}
+                saved[self.email.lower()] = cookies
+                # Session tokens: mkstemp creates the file private to the user
+                fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=".unix_agent_cookies.")
+                try:
+                    with os.fdopen(fd, "w", encoding="utf-8") as f:
+                        json.dump(saved, f)
+                    os.replace(tmp_path, path)
+                except BaseException:
+                    os.remove(tmp_path)
+                    raise
+            logger.debug(f"Saved session cookies to {path}")
+        except Exception as e:
+            logger.debug(f"Could not save cookies: {e}")
+    
+    def _restore_cookies(self) -> bool:
+        """
+        Load this account's saved session cookies into the browser.
+        
+        Returns:
+            True if any cookies were added
+        """
+        path = _cookies_file()
+        if not path:
+            return False
+        try:
+            with open(path, encoding="utf-8") as f:
+                cookies = json.load(f).get(self.email.lower())
+        except (OSError, ValueError):
+            return False
+        if not cookies:
+            return False
+        try:
+            # Cookies can only be set for the domain that is currently open
+            self.driver.get(self.BASE_URL)
+            for cookie in cookies:
+                try:
+                    self.driver.add_cookie(cookie)
+                except Exception as e:
+                    logger.debug(f"Skipping cookie {cookie.get('name')}: {e}")
+            return True
+        except Exception as e:
+            logger.debug(f"Could not restore cookies: {e}")
+            return False
+    
+    def _lesson_page_state(self) -> str | None:
+        """
+        Wait until the lesson page just opened shows either its content grid or
+        an error page.
+        
+        Returns:
+            "found", "missing" or "error" (see _LESSON_PAGE_STATE_JS), or None
+            if neither showed up in time
+        """
+        try:
+            return WebDriverWait(self.driver, 10, poll_frequency=0.2).until(
+                lambda d: d.execute_script(_LESSON_PAGE_STATE_JS)
+            )
+        except TimeoutException:
+            return None
+    
+    def _lesson_already_completed(self, lesson_url: str) -> bool:
+        """Check the database for a completed test of this lesson from an earlier run."""
+        if not self.db_manager:
+            return False
+        return self.db_manager.has_completed_lesson(self.email, lesson_url)
+    
+    def _open_lesson(self, lesson_url: str, attempts: int = 3) -> bool:
+        """
+        Open a lesson page, retrying failed loads and error pages with
+        exponential backoff and jitter.
+        
+        A 404 or a redirect away from the lesson is not retried; a page whose
+        state is unclear after the wait is assumed to exist and left to the
+        video/test steps.
+        
+        Returns:
+            True if the lesson exists
+        """
+        for attempt in range(attempts):
+            try:
+                self.driver.get(lesson_url)
+                state = self._lesson_page_state()
+                if state != "error":
+                    return state != "missing"
+                logger.warning(f"Error page for {lesson_url} (attempt {attempt + 1}/{attempts})")
+            except WebDriverException as e:
+                logger.warning(f"Failed to load {lesson_url} (attempt {attempt + 1}/{attempts}): {e}")
+            if attempt < attempts - 1:
+                time.sleep(min(30, 0.5 * 2 ** attempt) + random.uniform(0, 0.25))
+        return False
+    
+    def _set_input(self, element, value: str):
+        """
+        Set an input's value in one script call instead of one command per key.
+        
+        Goes through the native value setter and fires input/change events so
+        React picks up the new value; falls back to send_keys on failure.
+        """
+        try:
+            self.driver.execute_script(_SET_INPUT_JS, element, value)
+        except Exception as e:
+            logger.debug(f"Could not set input value via script: {e}")
+            element.clear()
+            element.send_keys(value)
+    
+    def _wait_ready(self, extra_selector: str = None, timeout: int = None):
+        """
+        Wait for the DOM to be ready instead of sleeping a fixed time.
+        
+        Args:
+            extra_selector: CSS selector of an element to wait for as well
+            timeout: Maximum seconds to wait (default: the shared 15s wait)
+        """
+        wait = self.wait_med if timeout is None else WebDriverWait(self.driver, timeout, poll_frequency=0.2)
+        try:
+            wait.until(lambda d: d.execute_script("return document.readyState") != "loading")
+            if extra_selector:
+                wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, extra_selector)))
+        except TimeoutException:
+            logger.warning("Page not ready in time, continuing anyway")
+    
+    def _cdp_evaluate(self, expression: str):
+        """Evaluate a JS expression over CDP and return its value."""
+        result = self.driver.execute_cdp_cmd("Runtime.evaluate", {
+            "expression": expression,
+            "returnByValue": True,
+        })
+        return result.get("result", {}).get("value")
+    
+    def _query_any(self, selectors: list[str]) -> bool:
+        """Check whether any of the selectors matches, in a single evaluation."""
+        return bool(self._cdp_evaluate(
+            f"document.querySelector({json.dumps(', '.join(selectors))}) !== null"
+        ))
+    
+    def _first_matching_selector(self, selectors: list[str]) -> str | None:
+        """Return the first selector (in list order) that matches any element, or None."""
+        index = self._cdp_evaluate(
+            f"{json.dumps(selectors)}.findIndex(s => document.querySelector(s) !== null)"
+        )
+        if index is None or index < 0:
+            return None
+        return selectors[index]
+    
     def _is_logged_in(self) -> bool:
         """Check if user is logged in by looking for user elements."""
         try:
             # Look for elements that indicate logged-in state
             # Based on screenshot: user email in header, lesson content, etc.
-            indicators = [
-                ".user-info",
-                ".user-email",
-                "[class*='profile']",
-                ".lesson-content",
-                ".video-player"
-            ]
-            
-            for selector in indicators:
-                elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                if elements:
-                    return True
-            
-            # Check URL - if we're on lessons page without redirect to login
-            if "/platform/lessons" in self.driver.current_url:
-                # Check for login form - if present, we're not logged in
-                login_forms = self.driver.find_elements(By.CSS_SELECTOR, "input[type='password']")
-                if not login_forms:
-                    return True
-            
-            return False
+            # Single script instead of one find_elements round trip per selector.
+            # Only a rendered user element counts: with eager page loads the
+            # lessons URL is still current before the SPA's auth redirect runs.
+            return self._query_any([".user-info", ".user-email", "[class*='profile']", ".lesson-content", ".video-player"])
         except:
             return False
     
@@ -354,7 +1090,7 @@ class UniXAgent:
         Get all available lessons from the sidebar.
         
         Returns:
-            List of lesson dictionaries with name, url, completed status
+            List of lesson dictionaries with name, element, url, completed status
         """
         logger.info("Fetching lesson list...")
         lessons = []
@@ -362,7 +1098,7 @@ class UniXAgent:
         try:
             # Navigate to lessons page
             self.driver.get(self.LESSONS_URL)
-            time.sleep(3)
+            self._wait_ready(".lesson-item, .sidebar-item, [class*='lesson'], .menu-item")
             
             # Find lesson items in sidebar
             # Based on screenshot: lessons are in left sidebar with expandable sections
@@ -373,21 +1109,29 @@ class UniXAgent:
                 ".menu-item"
             ]
             
-            for selector in lesson_selectors:
+            # Pick the first selector with matches in one evaluation
+            selector = self._first_matching_selector(lesson_selectors)
+            if selector:
                 items = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                if items:
-                    for item in items:
-                        try:
-                            name = item.text.strip()
-                            if name:
-                                lessons.append({
-                                    "name": name,
-                                    "element": item,
-                                    "completed": self._is_lesson_completed(item)
-                                })
-                        except:
-                            continue
-                    break
+                # Name, URL and completion state of every item in one script call;
+                # completed = completed/done/finished class or a checkmark icon
+                lesson_info = self.driver.execute_script("""
+                    return arguments[0].map(e => {
+                        const link = e.closest('a[href]') || e.querySelector('a[href]');
+                        const classes = (e.getAttribute('class') || '').toLowerCase();
+                        const completed = /completed|done|finished/.test(classes)
+                            || e.querySelector("[class*='check'], [class*='done']") !== null;
+                        return [(e.innerText || '').trim(), link ? link.href : null, completed];
+                    });
+                """, items)
+                for item, (name, url, is_completed) in zip(items, lesson_info):
+                    if name:
+                        lessons.append({
+                            "name": name,
+                            "element": item,
+                            "url": url,
+                            "completed": is_completed
+                        })
             
             logger.info(f"Found {len(lessons)} lessons")
             return lessons
@@ -396,18 +1140,101 @@ class UniXAgent:
             logger.error(f"Error fetching lessons: {e}")
             return []
     
-    def _is_lesson_completed(self, element) -> bool:
-        """Check if a lesson is marked as completed."""
+    def _start_video(self):
+        """
+        Find the video player on the current page and start playback.
+        
+        Returns:
+            The video element, or None if no video was found
+        """
+        logger.info("Looking for video player...")
+        
+        # Find video element
+        video_selectors = [
+            "video",
+            ".video-player video",
+            "iframe[src*='youtube']",
+            "iframe[src*='vimeo']",
+            ".plyr video"
+        ]
+        
+        video = None
+        for selector in video_selectors:
+            try:
+                video = self.wait.until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, selector))
+                )
+                break
+            except:
+                continue
+        
+        if not video:
+            logger.warning("No video found on page")
+            return None
+        
+        # Attach the end listeners before playback starts
+        try:
+            self.driver.execute_script(_VIDEO_DONE_LISTENER_JS, video)
+        except Exception as e:
+            logger.debug(f"Could not attach video listeners: {e}")
+        
+        # Try to play the video
+        try:
+            play_button = self.driver.find_element(
+                By.CSS_SELECTOR, 
+                "[class*='play'], button[aria-label*='play' i], .plyr__control--play"
+            )
+            if play_button.is_displayed():
+                play_button.click()
+                logger.info("Clicked play button")
+        except:
+            # Try clicking the video directly
+            try:
+                video.click()
+            except:
+                pass
+        
+        return video
+    
+    def _is_video_ended(self, video) -> bool:
+        """Check whether the video has ended, logging its progress otherwise."""
         try:
-            # Look for completion indicators (checkmark, green color, etc.)
-            classes = element.get_attribute("class") or ""
-            if any(kw in classes.lower() for kw in ['completed', 'done', 'finished']):
+            # Ended state and progress in a single round trip
+            status = self.driver.execute_script("""
+                const v = arguments[0];
+                return {
+                    ended: window.__videoDone === true || v.ended || v.currentTime >= v.duration - 1,
+                    current: v.currentTime,
+                    duration: v.duration,
+                };
+            """, video)
+            if status["ended"]:
                 return True
             
-            # Check for checkmark icon
-            icons = element.find_elements(By.CSS_SELECTOR, "[class*='check'], [class*='done']")
-            return len(icons) > 0
-        except:
+            current, duration = status["current"], status["duration"]
+            if duration and duration > 0:
+                progress = (current / duration) * 100
+                logger.info(f"Video progress: {progress:.1f}% ({current:.0f}s / {duration:.0f}s)")
+            
+        except Exception as e:
+            logger.debug(f"Could not get video progress: {e}")
+        return False
+    
+    def _wait_video_done(self, timeout: float) -> bool:
+        """
+        Wait inside the browser for the video-done event.
+        
+        The call returns the moment the listener installed by _start_video fires.
+        Keep timeout below the driver's script timeout (_SCRIPT_TIMEOUT).
+        
+        Returns:
+            True if the video ended within timeout
+        """
+        try:
+            return bool(self.driver.execute_async_script(_WAIT_VIDEO_DONE_JS, int(timeout * 1000)))
+        except Exception as e:
+            logger.debug(f"Could not wait for video end: {e}")
+            time.sleep(timeout)
             return False
     
     def watch_video(self, timeout_seconds: int = 6000) -> bool:
@@ -420,48 +1247,11 @@ class UniXAgent:
         Returns:
             True if video watched successfully
         """
-        logger.info("Looking for video player...")
-        
         try:
-            # Find video element
-            video_selectors = [
-                "video",
-                ".video-player video",
-                "iframe[src*='youtube']",
-                "iframe[src*='vimeo']",
-                ".plyr video"
-            ]
-            
-            video = None
-            for selector in video_selectors:
-                try:
-                    video = self.wait.until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                    )
-                    break
-                except:
-                    continue
-            
+            video = self._start_video()
             if not video:
-                logger.warning("No video found on page")
                 return True  # Continue anyway
             
-            # Try to play the video
-            try:
-                play_button = self.driver.find_element(
-                    By.CSS_SELECTOR, 
-                    "[class*='play'], button[aria-label*='play' i], .plyr__control--play"
-                )
-                if play_button.is_displayed():
-                    play_button.click()
-                    logger.info("Clicked play button")
-            except:
-                # Try clicking the video directly
-                try:
-                    video.click()
-                except:
-                    pass
-            
             # Get video duration and set timeout dynamically
             logger.info("Watching video...")
             # time.sleep(2)  # Wait for video metadata to load
@@ -482,28 +1272,16 @@ class UniXAgent:
             start_time = time.time()
             
             while time.time() - start_time < timeout_seconds:
-                try:
-                    # Check if video ended
-                    ended = self.driver.execute_script(
-                        "return arguments[0].ended || arguments[0].currentTime >= arguments[0].duration - 1",
-                        video
-                    )
-                    if ended:
-                        logger.info("Video completed!")
-                        return True
-                    
-                    # Get current progress
-                    current = self.driver.execute_script("return arguments[0].currentTime", video)
-                    duration = self.driver.execute_script("return arguments[0].duration", video)
-                    
-                    if duration and duration > 0:
-                        progress = (current / duration) * 100
-                        logger.info(f"Video progress: {progress:.1f}% ({current:.0f}s / {duration:.0f}s)")
-                    
-                except Exception as e:
-                    logger.debug(f"Could not get video progress: {e}")
+                # Block until the video's events report the end; log progress
+                # between waits
+                remaining = timeout_seconds - (time.time() - start_time)
+                if self._wait_video_done(min(_SCRIPT_TIMEOUT - 5, remaining)):
+                    logger.info("Video completed!")
+                    return True
                 
-                time.sleep(30)  # Check every 30 seconds
+                if self._is_video_ended(video):
+                    logger.info("Video completed!")
+                    return True
             
             logger.warning("Video timeout reached")
             return True
@@ -520,19 +1298,17 @@ class UniXAgent:
             True if test completed successfully
         """
         try:
-            import re
-            
             # First, check if test is already in progress (question visible on page)
-            page_text = self.driver.find_element(By.TAG_NAME, "body").text
+            page_text = self.driver.execute_script("return document.body.innerText || '';")
             test_already_open = False
             
             # Check for question pattern like "1.Calculate..." or "questions №"
-            if re.search(r'\d+\.\s*[A-ZА-Яa-zа-я].{20,}', page_text) and 'questions' in page_text.lower():
+            if _QUESTION_START_RE.search(page_text) and 'questions' in page_text.lower():
                 test_already_open = True
                 logger.info("Test already in progress (question visible on page)")
             
             # Also check for "Time for the test" indicator
-            if 'time for the test' in page_text.lower() or 'время на тест' in page_text.lower():
+            if _TEST_OPEN_RE.search(page_text):
                 test_already_open = True
                 logger.info("Test already in progress (timer visible)")
             
@@ -542,27 +1318,25 @@ class UniXAgent:
                 # Find "Test task" / "Go to test" button
                 test_button = None
                 
-                # Look for button/link with test-related text
-                buttons = self.driver.find_elements(By.TAG_NAME, "button")
-                buttons.extend(self.driver.find_elements(By.TAG_NAME, "a"))
-                
-                for btn in buttons:
-                    try:
-                        text = btn.text.lower()
-                        if ('test' in text or 'тест' in text) and btn.is_displayed():
-                            test_button = btn
-                            break
-                    except:
-                        continue
+                # Look for a button with test-related text, then for a link;
+                # one combined query would return a sidebar link before the button
+                for selector in ("button", "a"):
+                    test_button = next(
+                        (btn for btn in self._enumerate_buttons(selector)
+                         if _TEST_KW.search(btn["text"]) and btn["visible"]),
+                        None,
+                    )
+                    if test_button:
+                        break
                 
                 if not test_button:
                     logger.warning("No test button found")
                     return True  # Maybe no test for this lesson
                 
-                logger.info(f"Found test button: '{test_button.text}'")
+                logger.info(f"Found test button: '{test_button['text']}'")
                 
                 # Click the test button
-                self.driver.execute_script("arguments[0].click();", test_button)
+                self.driver.execute_script("arguments[0].click();", test_button["element"])
                 
                 # Wait for test page to load
                 logger.info("Waiting for test page to load...")
@@ -573,30 +1347,26 @@ class UniXAgent:
                 start_button = None
                 restart_button = None  # Fallback
                 
-                buttons = self.driver.find_elements(By.TAG_NAME, "button")
-                for btn in buttons:
-                    try:
-                        text = btn.text.lower().strip()
-                        if not btn.is_displayed():
-                            continue
-                        
-                        # Prefer "start the test" over "restart"
-                        if 'start the test' in text or 'начать тест' in text:
-                            start_button = btn
-                            break  # Found the exact button
-                        elif 'start' in text and 'restart' not in text:
-                            start_button = btn
-                        elif 'restart' in text or 'перезапустить' in text:
-                            restart_button = btn
-                    except:
+                for btn in self._enumerate_buttons():
+                    text = btn["text"].lower()
+                    if not btn["visible"]:
                         continue
+                    
+                    # Prefer "start the test" over "restart"
+                    if 'start the test' in text or 'начать тест' in text:
+                        start_button = btn
+                        break  # Found the exact button
+                    elif 'start' in text and 'restart' not in text:
+                        start_button = btn
+                    elif 'restart' in text or 'перезапустить' in text:
+                        restart_button = btn
                 
                 # Use start button, or fallback to restart
                 button_to_click = start_button or restart_button
                 
                 if button_to_click:
-                    logger.info(f"Found button: '{button_to_click.text}'")
-                    self.driver.execute_script("arguments[0].click();", button_to_click)
+                    logger.info(f"Found button: '{button_to_click['text']}'")
+                    self.driver.execute_script("arguments[0].click();", button_to_click["element"])
                     logger.info("Clicked start/restart button")
                     
                     # Wait longer for questions to load
@@ -607,17 +1377,22 @@ class UniXAgent:
             
             # Wait for any loading indicators to disappear
             try:
-                WebDriverWait(self.driver, 10).until(
+                self.wait_short.until(
                     EC.invisibility_of_element_located((By.CSS_SELECTOR, "[class*='loading'], [class*='spinner']"))
                 )
             except:
                 pass
             
-            # Save debug info to see what the test page looks like
-            self._save_debug_info("test_questions")
-            
             # Answer questions - tests always have 5 questions
             total_questions = 5
+            
+            # Answer every question up front if the page embeds the test payload
+            self._prefetch_answers(total_questions)
+            
+            # Save debug info to see what the test page looks like
+            if self.save_debug_artifacts:
+                self._save_debug_info("test_questions")
+            
             answered_count = 0
             
             for question_num in range(1, total_questions + 1):
@@ -626,7 +1401,6 @@ class UniXAgent:
                 # Navigate to the question by clicking on the question number button
                 # The test interface has numbered buttons (1, 2, 3, 4, 5) at the top
                 self._navigate_to_question(question_num)
-                time.sleep(1)
                 
                 if self._answer_current_question(expected_question_num=question_num):
                     answered_count += 1
@@ -635,115 +1409,373 @@ class UniXAgent:
                     logger.warning(f"Failed to answer question {question_num}, continuing to next...")
                     # Try to click Next button anyway to move to next question
                     try:
-                        next_button = None
-                        buttons = self.driver.find_elements(By.TAG_NAME, "button")
-                        for btn in buttons:
-                            try:
-                                text = btn.text.lower().strip()
-                                if any(kw in text for kw in ['next', 'далее', 'следующий']):
-                                    if btn.is_displayed() and btn.is_enabled():
-                                        next_button = btn
-                                        break
-                            except:
-                                continue
-                        
+                        next_button = self._find_next_button(self.driver)
                         if next_button:
                             logger.info(f"Clicking Next to skip to next question")
+                            self._arm_question_observer()
                             self.driver.execute_script("arguments[0].click();", next_button)
-                            time.sleep(2)
+                            self._wait_question_ready()
                     except Exception as e:
                         logger.error(f"Could not click Next button: {e}")
-                
-                time.sleep(2)
             
             logger.info(f"Answered {answered_count} out of {total_questions} questions")
             
-            # Look for submit/finish button after answering all questions
-            if answered_count > 0:
-                self._submit_test()
+            # Look for submit/finish button after answering all questions
+            if answered_count > 0:
+                self._submit_test()
+            
+            # Only a fully answered test lets later batch runs skip the lesson
+            if answered_count == total_questions and self.db_manager and self.current_lesson_url:
+                self.db_manager.mark_lesson_completed(self.email, self.current_lesson_url)
+            
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error completing test: {e}")
+            self._save_debug_info("test_error", failure=True)
+            return False
+    
+    def _prefetch_answers(self, max_questions: int):
+        """Ask the AI about all questions in parallel when the SPA embeds the test data.
+        
+        Many SPAs ship the full payload in window.__NEXT_DATA__ / __INITIAL_STATE__;
+        answering from it turns one serial LLM call per question into one parallel batch.
+        
+        Args:
+            max_questions: Number of questions in the test; state holding more
+                (e.g. a whole question bank) is not prefetched
+        """
+        self._prefetched_answers = {}
+        if not self.ai_helper:
+            return
+        try:
+            state = self.driver.execute_script("return window.__NEXT_DATA__ || window.__INITIAL_STATE__ || null;")
+        except Exception as e:
+            logger.debug(f"Could not read embedded page state: {e}")
+            return
+        
+        questions = _extract_state_questions(state) if state else []
+        if not questions:
+            return
+        if len(questions) > max_questions:
+            logger.info(f"Page state holds {len(questions)} questions, more than the test's {max_questions}; not prefetching")
+            return
+        
+        logger.info(f"Prefetching AI answers for {len(questions)} questions from page state")
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            futures = [
+                (executor.submit(self.ai_helper.answer_question, question, options), question, options)
+                for question, options in questions
+            ]
+            for future, question, options in futures:
+                try:
+                    answer_idx = future.result()
+                except Exception as e:
+                    logger.warning(f"Prefetch failed for question: {e}")
+                    continue
+                if 0 <= answer_idx < len(options):
+                    self._prefetched_answers[_normalize_question(question)] = options[answer_idx]
+    
+    def _element_texts(self, elements: list) -> list[str]:
+        """Read the trimmed text of all elements in a single script call."""
+        if not elements:
+            return []
+        try:
+            return self.driver.execute_script(
+                "return arguments[0].map(e => (e.innerText || '').trim());", elements
+            )
+        except Exception as e:
+            logger.debug(f"Could not read element texts: {e}")
+            return []
+    
+    def _enumerate_buttons(self, selector: str = "button") -> list[dict]:
+        """
+        Read every matching button's text and state in a single script call.
+        
+        Args:
+            selector: CSS selector for the buttons to read
+            
+        Returns:
+            List of dicts with element, text, visible and enabled keys
+        """
+        try:
+            return self.driver.execute_script(_ENUMERATE_BUTTONS_JS, selector) or []
+        except Exception as e:
+            logger.debug(f"Could not enumerate buttons: {e}")
+            return []
+    
+    def _submit_test(self):
+        """Submit/finish the test after answering all questions.
+        Per inspect.html: button with text 'Finish the test' or 'Send'.
+        """
+        logger.info("Looking for submit button...")
+        
+        for btn in self._enumerate_buttons():
+            if _SUBMIT_KW.search(btn["text"]) and btn["visible"] and btn["enabled"]:
+                logger.info(f"Clicking submit button: '{btn['text']}'")
+                self.driver.execute_script("arguments[0].click();", btn["element"])
+                time.sleep(2)
+                return
+        
+        logger.info("No submit button found")
+    
+    def _find_next_button(self, search_context):
+        """Find a displayed and enabled "Next" button, or None."""
+        root = None if search_context is self.driver else search_context
+        return self.driver.execute_script(_FIND_NEXT_BUTTON_JS, root, list(_NEXT_KEYWORDS))
+    
+    def _click_next_button(self, search_context, next_button) -> bool:
+        """
+        Click the "Next" button, re-finding it with a short backoff when React
+        re-rendered it between the lookup and the click.
+        
+        Returns:
+            True if the button was clicked
+        """
+        for delay in _STALE_RETRY_DELAYS:
+            try:
+                self.driver.execute_script("arguments[0].click();", next_button)
+                return True
+            except StaleElementReferenceException:
+                time.sleep(delay)
+                try:
+                    next_button = self._find_next_button(search_context)
+                except StaleElementReferenceException:
+                    next_button = self._find_next_button(self.driver)
+                if not next_button:
+                    break
+        logger.warning("Next button kept going stale, not clicked")
+        return False
+    
+    def _navigate_to_question(self, question_num: int):
+        """Navigate to a specific question by clicking on the question number button.
+        Per inspect.html: div.cursor-pointer.rounded-[100%] inside questions № area.
+        """
+        try:
+            # Usually the question is already on screen (the first one, or the
+            # one the Next click just moved to): nothing to click or wait for
+            if self._arm_question_observer(question_num):
+                logger.debug(f"Question {question_num} already shown")
+                return
+            # All three lookups run in the browser and the match is clicked there,
+            # instead of reading .text of every candidate over the wire
+            method = self.driver.execute_script(_NAVIGATE_TO_QUESTION_JS, str(question_num))
+            if method:
+                logger.info(f"Clicking question number ({method}): {question_num}")
+                self._wait_question_ready()
+                return
+            
+            logger.warning(f"Could not find question number button {question_num}")
             
+        except Exception as e:
+            logger.warning(f"Error navigating to question {question_num}: {e}")
+    
+    def _arm_question_observer(self, question_num: int = None) -> bool:
+        """Install a MutationObserver that resolves once a different question is shown.
+        Must be called before the click that triggers the transition.
+        
+        Args:
+            question_num: Resolve once this question is shown instead (or, if
+                question numbers cannot be read, once the question changes)
+        
+        Returns:
+            True if question_num is already shown, so there is nothing to wait for
+        """
+        try:
+            return bool(self.driver.execute_script(_QUESTION_FNS + """
+                const target = arguments[0];
+                if (target !== null && questionNumber() === target) {
+                    window.__qReady = Promise.resolve(true);
+                    return true;
+                }
+                const root = document.querySelector('.grid.grid-cols-12') || document.body;
+                const before = questionIdentity();
+                const shown = () => {
+                    const num = target === null ? null : questionNumber();
+                    if (num !== null) return num === target;
+                    const now = questionIdentity();
+                    return now !== null && now !== before;
+                };
+                window.__qReady = new Promise(resolve => {
+                    new MutationObserver((mutations, observer) => {
+                        if (shown()) {
+                            observer.disconnect();
+                            resolve(true);
+                        }
+                    }).observe(root, {childList: true, subtree: true});
+                });
+                return false;
+            """, question_num))
+        except Exception as e:
+            logger.debug(f"Could not install question observer: {e}")
+            return False
+    
+    def _wait_question_ready(self, timeout: float = 5) -> bool:
+        """Wait until the armed observer sees the question DOM change.
+        
+        Returns:
+            True if the transition was observed before the timeout
+        """
+        try:
+            return bool(self.driver.execute_async_script("""
+                const done = arguments[arguments.length - 1];
+                if (!window.__qReady) { done(false); return; }
+                const timer = setTimeout(() => done(false), arguments[0]);
+                window.__qReady.then(ready => { clearTimeout(timer); done(ready); });
+            """, int(timeout * 1000)))
+        except Exception as e:
+            logger.debug(f"Question transition wait failed: {e}")
+            return False
+    
+    def _cdp_click(self, element) -> bool:
+        """
+        Click the center of an element with trusted CDP mouse events.
+        
+        Returns:
+            False if the center is covered by another element or dispatch failed
+        """
+        try:
+            point = self.driver.execute_script("""
+                const el = arguments[0], r = el.getBoundingClientRect();
+                const x = r.x + r.width / 2, y = r.y + r.height / 2;
+                const hit = document.elementFromPoint(x, y);
+                return hit && (hit === el || el.contains(hit)) ? [x, y] : null;
+            """, element)
+            if not point:
+                return False
+            for event_type in ("mousePressed", "mouseReleased"):
+                self.driver.execute_cdp_cmd("Input.dispatchMouseEvent", {
+                    "type": event_type,
+                    "x": point[0],
+                    "y": point[1],
+                    "button": "left",
+                    "clickCount": 1,
+                })
             return True
-            
         except Exception as e:
-            logger.error(f"Error completing test: {e}")
-            self._save_debug_info("test_error")
+            logger.debug(f"CDP click failed: {e}")
             return False
     
-    def _submit_test(self):
-        """Submit/finish the test after answering all questions.
-        Per inspect.html: button with text 'Finish the test' or 'Send'.
+    def _scan_option_divs(self, search_context) -> list:
         """
-        logger.info("Looking for submit button...")
+        Find the answer option divs and read them in one script call.
         
-        buttons = self.driver.find_elements(By.TAG_NAME, "button")
-        for btn in buttons:
-            try:
-                text = btn.text.lower().strip()
-                if any(kw in text for kw in ['finish the test', 'finish', 'send', 'submit', 'complete', 'завершить', 'отправить', 'end']):
-                    if btn.is_displayed() and btn.is_enabled():
-                        logger.info(f"Clicking submit button: '{btn.text}'")
-                        self.driver.execute_script("arguments[0].click();", btn)
-                        time.sleep(2)
-                        return
-            except:
-                continue
+        Uses the first of _OPTION_DIV_SELECTORS that matches. Text comes from the
+        p.ml-4 label when present, else the whole div.
         
-        logger.info("No submit button found")
+        Returns:
+            List of [div, text, class] entries
+        """
+        return self.driver.execute_script("""
+            const [ctx, selectors] = arguments;
+            for (const selector of selectors) {
+                const divs = Array.from(ctx.querySelectorAll(selector));
+                if (!divs.length) continue;
+                return divs.map(div => {
+                    const label = div.querySelector('p.ml-4');
+                    return [div, ((label || div).innerText || '').trim(), div.getAttribute('class') || ''];
+                });
+            }
+            return [];
+        """, search_context, list(_OPTION_DIV_SELECTORS))
     
-    def _navigate_to_question(self, question_num: int):
-        """Navigate to a specific question by clicking on the question number button.
-        Per inspect.html: div.cursor-pointer.rounded-[100%] inside questions № area.
+    def _refind_option(self, search_context, option_text: str):
+        """Re-find an answer option by its text after the cached element went stale.
+        
+        Returns:
+            The option element, or None if not found
         """
+        option = None
         try:
-            # Method 1: Find question number buttons - rounded-[100%] divs (per inspect.html)
-            # Structure: div.flex.flex-row.overflow-x-auto contains div.rounded-[100%] with numbers 1-5
-            q_num_buttons = self.driver.find_elements(
-                By.CSS_SELECTOR, 
-                "div.cursor-pointer[class*='rounded-[100%]']"
-            )
-            for elem in q_num_buttons:
-                try:
-                    text = elem.text.strip()
-                    if text == str(question_num):
-                        logger.info(f"Clicking question number button: {question_num}")
-                        self.driver.execute_script("arguments[0].click();", elem)
-                        time.sleep(1)
-                        return
-                except:
-                    continue
-            
-            # Method 2: XPath - find div inside overflow-x-auto (questions area) with number
-            try:
-                xpath = f"//div[contains(@class, 'overflow-x-auto')]//div[contains(@class, 'cursor-pointer') and contains(@class, 'rounded-[100%]') and normalize-space(text())='{question_num}']"
-                buttons = self.driver.find_elements(By.XPATH, xpath)
-                for btn in buttons:
-                    if btn.is_displayed():
-                        logger.info(f"Clicking question number via XPath: {question_num}")
-                        self.driver.execute_script("arguments[0].click();", btn)
-                        time.sleep(1)
-                        return
-            except:
-                pass
+            # Strategy 1: div.bg-gray-cool.cursor-pointer - iterate and match text from p.ml-4
+            potential_options = self._scan_option_divs(search_context)
             
-            # Method 3: Fallback - div with number, exclude answer options (px-6 = options)
-            all_clickable = self.driver.find_elements(By.CSS_SELECTOR, "div.cursor-pointer")
-            for elem in all_clickable:
-                try:
-                    text = elem.text.strip()
-                    class_attr = elem.get_attribute('class') or ''
-                    if text == str(question_num) and len(text) <= 2:
-                        if 'rounded-[100%]' in class_attr or ('rounded-full' in class_attr and 'px-6' not in class_attr):
-                            logger.info(f"Clicking question number (fallback): {question_num}")
-                            self.driver.execute_script("arguments[0].click();", elem)
-                            time.sleep(1)
-                            return
-                except:
+            logger.debug("Re-searching: found %d candidate divs", len(potential_options))
+            for div, div_text, class_attr in potential_options:
+                if 'rounded-[100%]' in class_attr:
                     continue
+                logger.debug("Comparing option text: %r vs %r", div_text, option_text)
+                if div_text == option_text:
+                    option = div
+                    logger.info(f"Re-found option for: {option_text[:30]}...")
+                    break
             
-            logger.warning(f"Could not find question number button {question_num}")
-            
+            # Strategy 2: CSS query over all cursor-pointer divs, matching the exact
+            # (whitespace-normalized) text or its prefix in the browser; exact wins.
+            # Retried for up to 2s in case the options are still re-rendering.
+            if not option:
+                normalized = " ".join(option_text.split())
+                try:
+                    option = WebDriverWait(self.driver, 2, poll_frequency=0.1).until(
+                        lambda d: d.execute_script(_MATCH_OPTION_TEXT_JS, search_context, normalized, normalized[:40])
+                    )
+                except TimeoutException:
+                    option = None
+                if option:
+                    logger.info("Re-found option via text match")
+        
         except Exception as e:
-            logger.warning(f"Error navigating to question {question_num}: {e}")
+            # Traceback is only formatted when debug logging is on
+            logger.error(f"Could not re-find option element: {e}")
+            logger.debug("Re-find traceback", exc_info=True)
+            return None
+        
+        return option
+    
+    def _option_method_order(self) -> list[str]:
+        """Option scan methods to try, the precise one that worked last time first.
+        
+        The catch-all fallback matches almost any rounded div, so it always
+        stays last and is never remembered.
+        """
+        order = ["radio", "divs"]
+        if self._option_method in order:
+            order.remove(self._option_method)
+            order.insert(0, self._option_method)
+        return order + ["fallback"]
+    
+    def _find_options_radio(self, search_context) -> list:
+        """Method 1: radio/checkbox inputs - best method. Returns (text, element) pairs."""
+        # All inputs are resolved in one script instead of several calls each
+        found = self.driver.execute_script(_RADIO_OPTIONS_JS, search_context)
+        if found:
+            logger.info(f"Found {len(found)} radio/checkbox options")
+        return found
+    
+    def _find_options_divs(self, search_context) -> list:
+        """Method 2: clickable option divs, based on the inspect.html structure."""
+        logger.info("Looking for clickable div options")
+        found = []
+        potential_options = self._scan_option_divs(search_context)
+        
+        logger.info(f"Found {len(potential_options)} cursor-pointer divs (options area)")
+        
+        seen_texts = set()
+        for div, text, class_attr in potential_options:
+            if 'rounded-[100%]' in class_attr or ('rounded-full' in class_attr and 'px-6' not in class_attr):
+                continue
+            is_answer_option = (
+                'bg-gray-cool' in class_attr or
+                ('rounded-[24px]' in class_attr and 'px-6' in class_attr)
+            )
+            is_question_number = (
+                len(text) <= 3 and text and text[0].isdigit() and
+                (text.endswith('.') or text.isdigit())
+            )
+            if (text and 1 < len(text) < 150 and '\n' not in text and
+                    not is_question_number and is_answer_option):
+                if not _contains_any(text.lower(), _OPTION_SKIP_KEYWORDS):
+                    if text not in seen_texts:
+                        seen_texts.add(text)
+                        found.append((text, div))
+        return found
+    
+    def _find_options_fallback(self, search_context) -> list:
+        """Method 3: any divs that might be options."""
+        # Filtered in the browser with one script instead of reading
+        # .text and class of every div on the page over the wire
+        logger.info("Trying fallback method for option detection")
+        return self.driver.execute_script(_FALLBACK_OPTIONS_JS, search_context, _FALLBACK_SKIP_KEYWORDS)
     
     def _answer_current_question(self, expected_question_num: int = None) -> bool:
         """
@@ -758,65 +1790,57 @@ class UniXAgent:
         try:
             # Narrow down the search scope to the main content area to avoid sidebar/header
             # The sidebar has class 'md:col-span-4'. The main content is likely the other sibling.
-            search_context = self.driver.find_element(By.TAG_NAME, "body")
-            
-            try:
-                # Try to find the main content grid
-                main_grid = self.driver.find_element(By.CSS_SELECTOR, ".grid.grid-cols-12")
-                # The sidebar is usually the first child or has 'md:col-span-4'
-                # We want the content column, which might be 'md:col-span-8' or just the second large div
-                children = main_grid.find_elements(By.XPATH, "./div")
-                for child in children:
-                    class_attr = child.get_attribute("class") or ""
-                    # If it's NOT the sidebar (col-span-4), it's likely the content
-                    if "col-span-4" not in class_attr:
-                        search_context = child
-                        logger.info("Found main content area")
-                        break
-            except:
+            # The sidebar is usually the first child or has 'md:col-span-4'
+            # We want the content column, which might be 'md:col-span-8' or just the second large div
+            # Found together with its text in one script call
+            content = self.driver.execute_script("""
+                const grid = document.querySelector('.grid.grid-cols-12');
+                const column = grid && Array.from(grid.children).find(child =>
+                    child.tagName === 'DIV' && !(child.getAttribute('class') || '').includes('col-span-4'));
+                const area = column || document.body;
+                const text = Array.from(area.querySelectorAll('p, h1, h2, h3'), e => e.innerText).join('\\n');
+                return [area, text, !!column];
+            """)
+            search_context, page_text, found_content_area = content
+            if found_content_area:
+                logger.info("Found main content area")
+            else:
                 logger.warning("Could not identify main content area, searching whole body")
             
             # Look for any text that looks like a question (numbered, ending with ?)
-            page_text = search_context.text
             
             # Try to find question text - look for numbered questions or text with ?
             question_text = None
             
-            # First, try to find elements that look like questions
-            # Questions may end with ? or . (some are "Calculate..." not "What is...?")
-            import re
-            all_elements = search_context.find_elements(By.CSS_SELECTOR, "p, div, span")
-            for elem in all_elements:
-                try:
-                    text = elem.text.strip()
+            # Fast path: a single regex pass over the already-fetched paragraph and heading text
+            # Allow optional space after dot: "1.What" or "1. What"
+            # Question may end with ? or . (some questions are "Calculate..." not "What is...?")
+            question_match = _QUESTION_FULL_RE.search(page_text)
+            if question_match:
+                question_text = question_match.group(0)
+                logger.info(f"Found question via regex: {question_text[:80]}...")
+            
+            # Fallback: scan elements that look like questions
+            if not question_text:
+                all_elements = search_context.find_elements(By.CSS_SELECTOR, "p, div, span")
+                for text in self._element_texts(all_elements):
                     # Check if it looks like a question: starts with "N." and is long enough
-                    if text and len(text) > 30 and re.match(r'^\d+\.', text):
+                    if text and len(text) > 30 and _QUESTION_PREFIX_RE.match(text):
                         # Avoid navigation elements
-                        if not any(kw in text.lower() for kw in ['next', 'back', 'submit', 'start', 'finish', 'restart']):
+                        if not _contains_any(text.lower(), _NAV_KEYWORDS):
                             question_text = text
                             logger.info(f"Found question element: {text[:80]}...")
                             break
-                except:
-                    continue  # Skip stale elements
-            
-            # Fallback: search for numbered text via regex in the page text
-            if not question_text:
-                # Allow optional space after dot: "1.What" or "1. What"
-                # Question may end with ? or . (some questions are "Calculate..." not "What is...?")
-                question_match = re.search(r'\d+\.\s*[A-ZА-Яa-zа-я].{20,}[\?\.]', page_text)
-                if question_match:
-                    question_text = question_match.group(0)
-                    logger.info(f"Found question via regex: {question_text[:80]}...")
             
             if not question_text:
                 # Log what we see on the page for debugging
-                logger.info("No question text found. Content text preview:")
-                logger.info(page_text[:500] if len(page_text) > 500 else page_text)
+                logger.info("No question text found")
+                logger.debug(f"Content text preview: {page_text[:500]}")
                 return False
             
             # Log if we're on a different question than expected (but don't fail)
             if expected_question_num is not None:
-                found_num_match = re.match(r'^(\d+)\.', question_text)
+                found_num_match = _QUESTION_PREFIX_RE.match(question_text)
                 if found_num_match:
                     found_question_num = int(found_num_match.group(1))
                     if found_question_num != expected_question_num:
@@ -832,126 +1856,40 @@ class UniXAgent:
                 options = []
                 option_elements = []
                 
-                # Method 1: Look for inputs (radio/checkbox) - best method
-                radio_inputs = search_context.find_elements(By.CSS_SELECTOR, "input[type='radio'], input[type='checkbox']")
-                
-                if radio_inputs:
-                    logger.info(f"Found {len(radio_inputs)} radio/checkbox inputs")
-                    for radio in radio_inputs:
-                        try:
-                            parent = radio.find_element(By.XPATH, "./..")
-                            text = parent.text.strip()
-                            if text:
-                                options.append(text)
-                                option_elements.append(parent)
-                            else:
-                                radio_id = radio.get_attribute("id")
-                                if radio_id:
-                                    try:
-                                        label = search_context.find_element(By.CSS_SELECTOR, f"label[for='{radio_id}']")
-                                        text = label.text.strip()
-                                        if text:
-                                            options.append(text)
-                                            option_elements.append(label)
-                                    except:
-                                        pass
-                        except:
-                            continue
-                
-                # Method 2: Look for clickable option divs - based on inspect.html structure
-                if not options:
-                    logger.info("No radio inputs found, looking for clickable div options")
-                    potential_options = search_context.find_elements(
-                        By.CSS_SELECTOR, "div.cursor-pointer.bg-gray-cool"
-                    )
-                    if not potential_options:
-                        potential_options = search_context.find_elements(
-                            By.CSS_SELECTOR, "div.cursor-pointer[class*='rounded-[24px]']"
-                        )
-                    if not potential_options:
-                        potential_options = search_context.find_elements(
-                            By.CSS_SELECTOR, "div.cursor-pointer"
-                        )
-                    
-                    logger.info(f"Found {len(potential_options)} cursor-pointer divs (options area)")
-                    
-                    for div in potential_options:
-                        try:
-                            class_attr = div.get_attribute('class') or ''
-                            if 'rounded-[100%]' in class_attr or ('rounded-full' in class_attr and 'px-6' not in class_attr):
-                                continue
-                            try:
-                                p_elem = div.find_element(By.CSS_SELECTOR, "p.ml-4")
-                                text = p_elem.text.strip()
-                            except:
-                                text = div.text.strip()
-                            is_answer_option = (
-                                'bg-gray-cool' in class_attr or
-                                ('rounded-[24px]' in class_attr and 'px-6' in class_attr)
-                            )
-                            is_question_number = (
-                                len(text) <= 3 and text and text[0].isdigit() and
-                                (text.endswith('.') or text.isdigit())
-                            )
-                            if (text and 1 < len(text) < 150 and '\n' not in text and
-                                    not is_question_number and is_answer_option):
-                                if not any(kw in text.lower() for kw in [
-                                    'next', 'back', 'submit', 'start', 'finish',
-                                    'restart', 'question', 'timer', 'deadline',
-                                    'ответьте на все', 'answer all'
-                                ]):
-                                    if text not in options:
-                                        options.append(text)
-                                        option_elements.append(div)
-                        except:
-                            continue
-                
-                # Method 3: Fallback - look for any divs that might be options
-                if not options:
-                    logger.info("Trying fallback method for option detection")
-                    all_divs = search_context.find_elements(By.CSS_SELECTOR, "div")
-                    for div in all_divs:
-                        try:
-                            text = div.text.strip()
-                            class_attr = div.get_attribute('class') or ''
-                            is_question_number = (
-                                len(text) <= 3 and text and text[0].isdigit() and
-                                (text.endswith('.') or text.isdigit())
-                            )
-                            if text and 1 < len(text) < 100 and '\n' not in text:
-                                if not is_question_number:
-                                    if not any(kw in text.lower() for kw in [
-                                        'next', 'back', 'submit', 'start', 'finish',
-                                        'question', 'time', 'ответьте на все', 'answer all'
-                                    ]):
-                                        is_clickable = (
-                                            'cursor' in class_attr or 'rounded' in class_attr or
-                                            'bg-gray-cool' in class_attr or 'text-unix' in class_attr
-                                        )
-                                        if is_clickable and text not in options:
-                                            options.append(text)
-                                            option_elements.append(div)
-                        except:
-                            continue
+                # The precise method that found options last time is tried first;
+                # the others only run when it comes up empty, the fallback last
+                for method in self._option_method_order():
+                    found = getattr(self, f"_find_options_{method}")(search_context)
+                    if found:
+                        self._option_method = method if method != "fallback" else None
+                        for text, elem in found:
+                            options.append(text)
+                            option_elements.append(elem)
+                        break
+                else:
+                    self._option_method = None
                 
-                # Filter and deduplicate
-                unique_options = []
-                unique_elements = []
-                for i, opt in enumerate(options):
+                # Filter and deduplicate (dict keeps first-seen order), cap at 6
+                seen = {}
+                for opt, elem in zip(options, option_elements):
                     opt = opt.strip()
-                    if opt and opt not in unique_options and len(unique_options) < 6:
-                        unique_options.append(opt)
-                        unique_elements.append(option_elements[i])
+                    if opt:
+                        seen.setdefault(opt, elem)
                 
-                options = unique_options
-                option_elements = unique_elements
+                options = list(seen)[:6]
+                option_elements = [seen[opt] for opt in options]
                 logger.info(f"Attempt {attempt + 1}/5: found {len(options)} options")
                 
                 if len(options) == 4:
                     break
                 if attempt < 4:
-                    logger.info(f"Expected 4 options, got {len(options)}. Retrying in 1 sec...")
-                    time.sleep(1)
+                    logger.info(f"Expected 4 options, got {len(options)}. Waiting for more to render...")
+                    try:
+                        WebDriverWait(self.driver, 1, poll_frequency=0.1).until(
+                            lambda d: len(search_context.find_elements(By.CSS_SELECTOR, _OPTION_DIV_SELECTORS[0])) >= 4
+                        )
+                    except (TimeoutException, StaleElementReferenceException):
+                        pass
             
             if not options:
                 logger.warning("No answer options found after 5 attempts")
@@ -959,166 +1897,109 @@ class UniXAgent:
             
             logger.info(f"Found {len(options)} unique options: {options}")
             
-            # Use AI to get the answer
-            if self.ai_helper:
+            # Use AI to get the answer, unless this question was answered before
+            # (e.g. the test was restarted)
+            cache_key = _answer_cache_key(question_text, options)
+            cached = self._answer_cache.get(cache_key)
+            prefetched = self._prefetched_answers.get(_normalize_question(question_text))
+            if cached in options:
+                answer_idx = options.index(cached)
+                logger.info("Using cached answer")
+            elif prefetched in options:
+                answer_idx = options.index(prefetched)
+                logger.info("Using prefetched AI answer")
+            elif self.ai_helper:
                 answer_idx = self.ai_helper.answer_question(question_text, options)
             else:
                 logger.warning("AI not available, selecting first option")
                 answer_idx = 0
+            if self.ai_helper and 0 <= answer_idx < len(options):
+                self._answer_cache[cache_key] = options[answer_idx]
             
-            # Save question and answers to database BEFORE clicking
+            # Save question and answers to database in the background while clicking
             if self.db_manager and answer_idx < len(options):
-                try:
-                    success = self.db_manager.save_question_with_answers(
-                        user_email=self.email,
-                        question_text=question_text,
-                        answer_options=options,
-                        selected_answer_idx=answer_idx,
-                        lesson_name=self.current_lesson_name,
-                        lesson_url=self.current_lesson_url
-                    )
-                    if success:
-                        logger.info("Question and answers saved to database")
-                    else:
-                        logger.warning("Failed to save question to database")
-                except Exception as e:
-                    logger.error(f"Error saving to database: {e}")
+                future = self._io_pool.submit(
+                    self.db_manager.save_question_with_answers,
+                    user_email=self.email,
+                    question_text=question_text,
+                    answer_options=options,
+                    selected_answer_idx=answer_idx,
+                    lesson_name=self.current_lesson_name,
+                    lesson_url=self.current_lesson_url
+                )
+                future.add_done_callback(_log_db_save_result)
             
-            # Click the answer - re-find element to avoid stale reference
+            # Click the answer
             if answer_idx < len(options):
                 selected_option_text = options[answer_idx]
                 logger.info(f"Selecting answer {answer_idx + 1}: {selected_option_text[:50]}...")
                 
-                # Re-find the option element to avoid stale reference issues
-                # The page may have re-rendered since we first found the elements
-                option = None
-                
-                # Re-find the option element (per inspect.html: div.bg-gray-cool with p.ml-4)
-                try:
-                    # Strategy 1: div.bg-gray-cool.cursor-pointer - iterate and match text from p.ml-4
-                    potential_options = search_context.find_elements(
-                        By.CSS_SELECTOR, "div.cursor-pointer.bg-gray-cool"
-                    )
-                    if not potential_options:
-                        potential_options = search_context.find_elements(
-                            By.CSS_SELECTOR, "div.cursor-pointer[class*='rounded-[24px]']"
-                        )
-                    if not potential_options:
-                        potential_options = search_context.find_elements(By.CSS_SELECTOR, "div.cursor-pointer")
-                    
-                    logger.info(f"Re-searching: found {len(potential_options)} candidate divs")
-                    for div in potential_options:
-                        try:
-                            if 'rounded-[100%]' in (div.get_attribute('class') or ''):
-                                continue
-                            try:
-                                p_div = div.find_element(By.CSS_SELECTOR, "p.ml-4")
-                                div_text = p_div.text.strip()
-                            except:
-                                div_text = div.text.strip()
-                            if div_text == selected_option_text:
-                                option = div
-                                logger.info(f"Re-found option for: {selected_option_text[:30]}...")
-                                break
-                        except Exception as inner_e:
-                            continue
-                    
-                    # Strategy 2: XPath - find p by contains with safe substring
-                    if not option and len(selected_option_text) > 10:
-                        safe_sub = selected_option_text[:40].replace("'", "\\'").replace('"', '\\"')
-                        try:
-                            xpath = f"//p[contains(@class, 'ml-4') and contains(normalize-space(.), '{safe_sub}')]"
-                            p_elem = search_context.find_element(By.XPATH, xpath)
-                            option = p_elem.find_element(By.XPATH, "..")
-                            logger.info("Re-found option via p.ml-4 XPath")
-                        except:
-                            pass
-                
-                except Exception as e:
-                    logger.error(f"Could not re-find option element: {e}")
-                    import traceback
-                    logger.error(traceback.format_exc())
-                    return False
-                
-                if not option:
-                    logger.error(f"Could not find option with text: {selected_option_text}")
-                    return False
-                
-                # Give the element a moment to become fully interactive
-                time.sleep(0.5)
+                # Reuse the element found during the scan; it is only re-found
+                # when the page re-rendered and the reference went stale
+                option = option_elements[answer_idx]
                 
                 # Scroll element into view
                 try:
-                    self.driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", option)
-                    time.sleep(0.5)
+                    self.driver.execute_script("arguments[0].scrollIntoView({behavior: 'instant', block: 'center'});", option)
+                except StaleElementReferenceException:
+                    logger.info("Option element went stale, re-finding it")
+                    option = self._refind_option(search_context, selected_option_text)
+                    if not option:
+                        logger.error(f"Could not find option with text: {selected_option_text}")
+                        return False
+                    try:
+                        self.driver.execute_script("arguments[0].scrollIntoView({behavior: 'instant', block: 'center'});", option)
+                    except Exception as e:
+                        logger.warning(f"Could not scroll to element: {e}")
                 except Exception as e:
                     logger.warning(f"Could not scroll to element: {e}")
                 
-                # Try multiple click strategies
-                clicked = False
-                
-                # Strategy 1: Direct click
+                # Wait for the element to become fully interactive
                 try:
-                    option.click()
-                    clicked = True
-                    logger.info("Clicked using direct click")
-                except Exception as e:
-                    logger.debug(f"Direct click failed: {e}")
+                    WebDriverWait(self.driver, 2, poll_frequency=0.1).until(EC.element_to_be_clickable(option))
+                except TimeoutException:
+                    logger.debug("Option not reported clickable, trying to click anyway")
                 
-                # Strategy 2: JavaScript click
-                if not clicked:
-                    try:
-                        self.driver.execute_script("arguments[0].click();", option)
-                        clicked = True
-                        logger.info("Clicked using JavaScript")
-                    except Exception as e:
-                        logger.debug(f"JavaScript click failed: {e}")
+                # Remember which question is on screen to detect auto-advance
+                try:
+                    prev_question_signature = self.driver.execute_script(_QUESTION_SIGNATURE_JS)
+                except Exception:
+                    prev_question_signature = None
                 
-                # Strategy 3: Click the inner radio button circle if it exists
-                if not clicked:
-                    try:
-                        # Look for the visual radio button (the circular div)
-                        inner_circle = option.find_element(By.CSS_SELECTOR, "div[class*='rounded-full']")
-                        self.driver.execute_script("arguments[0].click();", inner_circle)
-                        clicked = True
-                        logger.info("Clicked using inner circle")
-                    except Exception as e:
-                        logger.debug(f"Inner circle click failed: {e}")
+                # Click strategies: a trusted click, then one JS click; a failure of
+                # both (usually a stale handle) goes straight to the re-find below
+                # Strategy 1: Trusted mouse click via CDP (accepted by SPAs that
+                # ignore synthetic events)
+                clicked = self._cdp_click(option)
+                if clicked:
+                    logger.info("Clicked using CDP mouse events")
                 
-                # Strategy 4: Try ActionChains
+                # Strategy 2: JavaScript cascade - the option, its inner radio circle,
+                # then its p tag, all tried in a single round trip
                 if not clicked:
                     try:
-                        from selenium.webdriver.common.action_chains import ActionChains
-                        actions = ActionChains(self.driver)
-                        actions.move_to_element(option).click().perform()
-                        clicked = True
-                        logger.info("Clicked using ActionChains")
+                        target = self.driver.execute_script(_CLICK_CASCADE_JS, option)
+                        if target:
+                            clicked = True
+                            logger.info(f"Clicked using JavaScript ({target})")
                     except Exception as e:
-                        logger.debug(f"ActionChains click failed: {e}")
+                        logger.debug(f"JavaScript click failed: {e}")
                 
-                # Strategy 5: Try clicking the p tag with the text
                 if not clicked:
+                    logger.warning("Failed to click option - re-finding it by text")
+                    # Try one more time once an option is clickable again
                     try:
-                        p_tag = option.find_element(By.TAG_NAME, "p")
-                        self.driver.execute_script("arguments[0].click();", p_tag)
-                        clicked = True
-                        logger.info("Clicked p tag")
-                    except Exception as e:
-                        logger.debug(f"P tag click failed: {e}")
-                
-                if not clicked:
-                    logger.error("Failed to click option using any strategy - will retry")
-                    # Try one more time with a longer wait
-                    time.sleep(1)
+                        WebDriverWait(self.driver, 1, poll_frequency=0.1).until(
+                            EC.element_to_be_clickable((By.CSS_SELECTOR, _CURSOR_POINTER_CSS))
+                        )
+                    except TimeoutException:
+                        pass
                     try:
-                        # Try refreshing the element reference one more time
-                        potential_options = search_context.find_elements(By.CSS_SELECTOR, "div.cursor-pointer")
-                        for div in potential_options:
-                            if div.text.strip() == selected_option_text:
-                                self.driver.execute_script("arguments[0].click();", div)
-                                clicked = True
-                                logger.info("Retry click succeeded!")
-                                break
+                        # Re-find the option and its inner click targets in one query
+                        target = self.driver.execute_script(_RETRY_CLICK_JS, search_context, selected_option_text)
+                        if target:
+                            clicked = True
+                            logger.info(f"Retry click succeeded ({target})!")
                     except Exception as e:
                         logger.error(f"Retry also failed: {e}")
                     
@@ -1126,27 +2007,28 @@ class UniXAgent:
                         logger.error("All click attempts failed, skipping this question")
                         return False
                 
-                time.sleep(1)
-                
-                # Look for "Next" button within the search context
-                next_button = None
-                buttons = search_context.find_elements(By.TAG_NAME, "button")
+                # Wait for whichever comes first: the page advancing on its own, or
+                # the "Next" button becoming enabled after the answer is registered
+                def advanced_or_next(d):
+                    if prev_question_signature is not None:
+                        signature = d.execute_script(_QUESTION_SIGNATURE_JS)
+                        if signature is not None and signature != prev_question_signature:
+                            return "advanced"
+                    return self._find_next_button(search_context)
                 
-                for btn in buttons:
-                    try:
-                        text = btn.text.lower().strip()
-                        if any(kw in text for kw in ['next', 'далее', 'следующий']):
-                            if btn.is_displayed() and btn.is_enabled():
-                                next_button = btn
-                                break
-                    except:
-                        continue
+                try:
+                    next_button = WebDriverWait(self.driver, 3, poll_frequency=0.1).until(advanced_or_next)
+                except TimeoutException:
+                    next_button = None
                 
-                if next_button:
-                    logger.info(f"Clicking: {next_button.text}")
-                    self.driver.execute_script("arguments[0].click();", next_button)
-                    # Wait longer for page to update
-                    time.sleep(3)
+                if next_button == "advanced":
+                    logger.info("Question advanced automatically")
+                elif next_button:
+                    logger.info("Clicking Next button")
+                    self._arm_question_observer()
+                    if self._click_next_button(search_context, next_button):
+                        # Wait for the next question to render
+                        self._wait_question_ready()
                 
                 return True
             
@@ -1154,40 +2036,43 @@ class UniXAgent:
             
         except Exception as e:
             logger.error(f"Error answering question: {e}")
-            import traceback
-            logger.error(traceback.format_exc())
+            logger.debug("Answer traceback", exc_info=True)
             return False
     
-    def process_lesson(self, lesson_name: str) -> bool:
+    def process_lesson(self, lesson: dict) -> bool:
         """
         Process a single lesson: watch video and complete test.
         
         Args:
-            lesson_name: Name of the lesson to process
+            lesson: Lesson dictionary from get_lessons() (name, element, completed)
             
         Returns:
             True if lesson processed successfully
         """
+        lesson_name = lesson["name"]
         logger.info(f"Processing lesson: {lesson_name}")
         self.current_lesson_name = lesson_name
         self.current_lesson_url = self.driver.current_url  # Initial URL
         
         # Click on the lesson
         try:
-            lessons = self.get_lessons()
-            target_lesson = None
-            
-            for lesson in lessons:
-                if lesson_name.lower() in lesson["name"].lower():
-                    target_lesson = lesson
-                    break
-            
-            if target_lesson:
-                self.driver.execute_script("arguments[0].click();", target_lesson["element"])
-                time.sleep(3)
-                self.current_lesson_url = self.driver.current_url  # Update URL after navigation
-        except:
-            pass
+            prev_url = self.driver.current_url
+            try:
+                self.driver.execute_script("arguments[0].click();", lesson["element"])
+            except StaleElementReferenceException:
+                # The sidebar re-rendered since the list was fetched (e.g. after
+                # visiting a previous lesson) - fetch it again and match by name
+                target_lesson = next(
+                    (item for item in self.get_lessons() if lesson_name.lower() in item["name"].lower()),
+                    None
+                )
+                if target_lesson:
+                    self.driver.execute_script("arguments[0].click();", target_lesson["element"])
+            # Wait for the lesson page instead of a fixed pause
+            self.wait_short.until(EC.url_changes(prev_url))
+            self.current_lesson_url = self.driver.current_url  # Update URL after navigation
+        except WebDriverException as e:
+            logger.warning(f"Could not open lesson {lesson_name}: {e}")
         
         # Watch video
         self.watch_video()
@@ -1197,14 +2082,73 @@ class UniXAgent:
         
         return True
     
-    def run(self):
-        """Main execution loop - process all lessons."""
+    def process_lessons_in_tabs(self, lessons: list[dict], max_tabs: int = 3, timeout_seconds: int = 6000):
+        """
+        Process several lessons at once, one browser tab per lesson.
+        
+        A single WebDriver cannot run commands concurrently, so the tabs are
+        driven round-robin: all videos of a group play at the same time and are
+        polled in turn, then the tests are completed one tab after another.
+        
+        Args:
+            lessons: Lesson dictionaries with a "url"
+            max_tabs: Number of lessons processed side by side
+            timeout_seconds: Maximum time to wait for the videos of one group
+        """
+        main_handle = self.driver.current_window_handle
+        
+        for start in range(0, len(lessons), max_tabs):
+            group = lessons[start:start + max_tabs]
+            tabs = []
+            
+            # Open every lesson of the group in its own tab and start its video
+            for lesson in group:
+                logger.info(f"Opening lesson in new tab: {lesson['name']}")
+                self.driver.switch_to.new_window("tab")
+                tab = {"handle": self.driver.current_window_handle, "lesson": lesson, "video": None}
+                tabs.append(tab)
+                try:
+                    self.driver.get(lesson["url"])
+                    self._wait_ready()
+                    tab["video"] = self._start_video()
+                except Exception as e:
+                    logger.error(f"Error starting video for {lesson['name']}: {e}")
+            
+            # Poll the playing videos in turn until all of them ended
+            pending = [tab for tab in tabs if tab["video"] is not None]
+            start_time = time.time()
+            while pending and time.time() - start_time < timeout_seconds:
+                time.sleep(30)  # Check every 30 seconds
+                for tab in list(pending):
+                    self.driver.switch_to.window(tab["handle"])
+                    if self._is_video_ended(tab["video"]):
+                        logger.info(f"Video completed: {tab['lesson']['name']}")
+                        pending.remove(tab)
+            if pending:
+                logger.warning("Video timeout reached")
+            
+            # Complete the tests one tab at a time
+            for tab in tabs:
+                self.driver.switch_to.window(tab["handle"])
+                self.current_lesson_name = tab["lesson"]["name"]
+                self.current_lesson_url = self.driver.current_url
+                logger.info(f"Processing lesson: {self.current_lesson_name}")
+                self.complete_test()
+                self.driver.close()
+            
+            self.driver.switch_to.window(main_handle)
+    
+    def run(self, tabs: int = 1):
+        """
+        Main execution loop - process all lessons.
+        
+        Args:
+            tabs: Number of lessons to process side by side in separate tabs
+        """
         logger.info("Starting UniX Agent...")
         
         try:
-            self.setup_driver()
-            self.setup_ai()
-            self.setup_database()
+            self.setup()
             
             if not self.login():
                 logger.error("Failed to login. Exiting.")
@@ -1218,9 +2162,12 @@ class UniXAgent:
                 return
             
             # Process each uncompleted lesson
-            for lesson in lessons:
-                if not lesson.get("completed", False):
-                    self.process_lesson(lesson["name"])
+            pending = [lesson for lesson in lessons if not lesson.get("completed", False)]
+            if tabs > 1 and pending and all(lesson.get("url") for lesson in pending):
+                self.process_lessons_in_tabs(pending, max_tabs=tabs)
+            else:
+                for lesson in pending:
+                    self.process_lesson(lesson)
                     time.sleep(5)  # Pause between lessons
             
             logger.info("All lessons processed!")
@@ -1232,34 +2179,246 @@ class UniXAgent:
         finally:
             self.cleanup()
     
+    def run_parallel(self, n_workers: int = 4):
+        """
+        Process all uncompleted lessons across a pool of browser processes.
+        
+        The lesson list is read once with this agent's browser; the lessons are
+        then shared out to worker processes that each keep one logged-in browser.
+        
+        Args:
+            n_workers: Number of browsers running at the same time
+        """
+        logger.info(f"Starting UniX Agent with {n_workers} workers...")
+        
+        try:
+            self.setup(ai=False, database=False)
+            if not self.login():
+                logger.error("Failed to login. Exiting.")
+                return
+            lessons = self.get_lessons()
+        finally:
+            self.cleanup()
+        
+        pending = [lesson for lesson in lessons if not lesson.get("completed", False)]
+        for lesson in pending:
+            if not lesson.get("url"):
+                logger.warning(f"Skipping lesson without URL: {lesson['name']}")
+        pending = [lesson for lesson in pending if lesson.get("url")]
+        if not pending:
+            logger.warning("No lessons to process")
+            return
+        
+        _process_lessons_parallel(
+            self.email, self.password, self.headless,
+            [(lesson["name"], lesson["url"]) for lesson in pending],
+            n_workers=n_workers,
+        )
+        
+        logger.info("All lessons processed!")
+    
     def cleanup(self):
         """Clean up resources."""
+        # Let queued database writes finish before exiting; the fresh pool keeps
+        # the agent reusable after setup_driver (its thread starts on first use)
+        self._io_pool.shutdown(wait=True)
+        self._io_pool = ThreadPoolExecutor(max_workers=1)
         if self.driver:
             self.driver.quit()
+            self.driver = None
             logger.info("WebDriver closed")
     
-    def _save_debug_info(self, prefix: str):
-        """Save debug information for troubleshooting."""
-        if not self.save_debug_artifacts:
+    def _save_debug_info(self, prefix: str, failure: bool = False):
+        """Save debug information for troubleshooting.
+        
+        The page source is reused when another dump was taken less than a second
+        ago, and the files are written in a background thread.
+        
+        Args:
+            prefix: File name prefix
+            failure: Dump taken on a failure path (also saved in "errors" mode)
+        """
+        if not (self.save_failure_artifacts if failure else self.save_debug_artifacts):
             return
         try:
             timestamp = int(time.time())
+            screenshot_png = self.driver.get_screenshot_as_png()
+            
+            now = time.time()
+            if self._last_page_source is None or now - self._debug_snapshot_ts >= 1.0:
+                self._last_page_source = self.driver.page_source
+                self._debug_snapshot_ts = now
+            page_source = self._last_page_source
             
-            # Save screenshot
             screenshot_path = f"images/debug_{prefix}_{timestamp}.png"
-            self.driver.save_screenshot(screenshot_path)
+            html_path = f"images/debug_{prefix}_{timestamp}.html"
+            threading.Thread(
+                target=self._write_debug_files,
+                args=(screenshot_path, screenshot_png, html_path, page_source),
+                daemon=True,
+            ).start()
+            
+        except Exception as e:
+            logger.error(f"Failed to save debug info: {e}")
+    
+    @staticmethod
+    def _write_debug_files(screenshot_path: str, screenshot_png: bytes, html_path: str, page_source: str):
+        """Write a debug screenshot and page source to disk."""
+        try:
+            with open(screenshot_path, "wb") as f:
+                f.write(screenshot_png)
             logger.info(f"Saved screenshot: {screenshot_path}")
             
-            # Save page source
-            html_path = f"images/debug_{prefix}_{timestamp}.html"
             with open(html_path, "w", encoding="utf-8") as f:
-                f.write(self.driver.page_source)
+                f.write(page_source)
             logger.info(f"Saved page source: {html_path}")
-            
         except Exception as e:
             logger.error(f"Failed to save debug info: {e}")
 
 
+# Browser kept by each pool worker process between lessons, recycled after
+# MAX_USES_PER_BROWSER lessons or after an error
+MAX_USES_PER_BROWSER = 50
+_worker_agent = None
+_worker_agent_uses = 0
+_worker_agent_finalizer = None
+
+
+def _get_worker_agent(email: str, password: str, headless: bool):
+    """Return this worker process's logged-in agent, starting one if needed."""
+    global _worker_agent, _worker_agent_uses, _worker_agent_finalizer
+    if _worker_agent is not None and _worker_agent_uses >= MAX_USES_PER_BROWSER:
+        _drop_worker_agent()
+    if _worker_agent is None:
+        agent = UniXAgent(email, password, headless=headless)
+        # Throwaway profile per browser, deleted again by _close_worker_agent
+        agent.user_data_dir = tempfile.mkdtemp(prefix="unix-agent-chrome-")
+        try:
+            agent.setup()
+            logged_in = agent.login()
+        except Exception:
+            _close_worker_agent(agent)
+            raise
+        if not logged_in:
+            _close_worker_agent(agent)
+            return None
+        _worker_agent, _worker_agent_uses = agent, 0
+        # Pool workers leave through multiprocessing's exit hooks, not atexit
+        _worker_agent_finalizer = multiprocessing.util.Finalize(
+            agent, _close_worker_agent, args=(agent,), exitpriority=10
+        )
+    _worker_agent_uses += 1
+    return _worker_agent
+
+
+def _close_worker_agent(agent):
+    """Close a worker's browser and delete its temporary Chrome profile."""
+    try:
+        agent.cleanup()
+    except Exception:
+        pass
+    shutil.rmtree(agent.user_data_dir, ignore_errors=True)
+
+
+def _drop_worker_agent():
+    """Close this worker process's browser so the next lesson starts a fresh one."""
+    global _worker_agent, _worker_agent_finalizer
+    if _worker_agent_finalizer is not None:
+        # Runs _close_worker_agent once and unregisters it from the exit hooks
+        _worker_agent_finalizer()
+        _worker_agent_finalizer = None
+    _worker_agent = None
+
+
+def _process_lesson_worker(email: str, password: str, headless: bool, lesson_name: str, lesson_url: str,
+                           skip_video: bool = False, redo: bool = False,
+                           position: int = None, total: int = None) -> bool:
+    """
+    Process one lesson with this worker process's browser; runs in a worker process.
+    
+    Args:
+        position: 1-based place of the lesson in the run, for the progress line
+        total: Number of lessons in the run
+    
+    Returns:
+        True if the lesson was processed
+    """
+    # Same progress line as the sequential loops; agent_runner parses it
+    lesson_id = lesson_url.rstrip("/").rsplit("/", 1)[-1]
+    logger.info(f"Processing lesson {lesson_id} ({position}/{total})")
+    agent = _get_worker_agent(email, password, headless)
+    if agent is None:
+        logger.error(f"Login failed, cannot process lesson {lesson_name}")
+        return False
+    try:
+        agent.current_lesson_name = lesson_name
+        agent.current_lesson_url = lesson_url
+        if not redo and agent._lesson_already_completed(lesson_url):
+            logger.info(f"Lesson {lesson_name} already completed in an earlier run, skipping")
+            return True
+        if not agent._open_lesson(lesson_url):
+            logger.warning(f"Lesson {lesson_name} not found or not accessible, skipping...")
+            return False
+        if skip_video:
+            logger.info("Skipping video (--skip-video flag set)")
+        else:
+            agent.watch_video()
+        agent.complete_test()
+        return True
+    except Exception as e:
+        logger.exception(f"Error processing lesson {lesson_name}: {e}")
+        _drop_worker_agent()
+        return False
+
+
+def _process_lessons_parallel(email: str, password: str, headless: bool, lessons: list[tuple[str, str]],
+                              n_workers: int = 4, skip_video: bool = False, redo: bool = False,
+                              max_consecutive_failures: int = None) -> tuple[int, int]:
+    """
+    Process lessons across a pool of browser processes.
+    
+    Each worker process logs in once and keeps its browser for the lessons it
+    is given (see MAX_USES_PER_BROWSER).
+    
+    Args:
+        lessons: (name, url) pairs
+        n_workers: Number of browsers running at the same time
+        redo: Also process lessons already recorded as completed in the database
+        max_consecutive_failures: Cancel the lessons not started yet after this
+            many failures in a row (in completion order); None never stops
+        
+    Returns:
+        Number of lessons processed and failed
+    """
+    processed = failed = consecutive_failures = 0
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_setup_worker_logging) as executor:
+        futures = {
+            executor.submit(_process_lesson_worker, email, password, headless, name, url, skip_video, redo,
+                            i + 1, len(lessons)): name
+            for i, (name, url) in enumerate(lessons)
+        }
+        for future in as_completed(futures):
+            if future.cancelled():
+                continue
+            try:
+                ok = future.result()
+            except Exception as e:
+                logger.error(f"Worker failed for {futures[future]}: {e}")
+                ok = False
+            logger.info(f"Lesson {futures[future]}: {'done' if ok else 'failed'}")
+            if ok:
+                processed += 1
+                consecutive_failures = 0
+                continue
+            failed += 1
+            consecutive_failures += 1
+            if max_consecutive_failures and consecutive_failures == max_consecutive_failures:
+                logger.info(f"Reached {max_consecutive_failures} consecutive failures, cancelling remaining lessons")
+                for pending in futures:
+                    pending.cancel()
+    return processed, failed
+
+
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(description="UniX Platform Lecture Agent")
@@ -1270,10 +2429,13 @@ def main():
     parser.add_argument("--lesson", type=str, help="Specific lesson URL to process (e.g., https://uni-x.almv.kz/platform/lessons/9839)")
     parser.add_argument("--lesson-ids", type=str, help="Comma-separated lesson IDs for batch (e.g., 9858,9859,9860). Same logic as single mode, one browser session.")
     parser.add_argument("--skip-video", action="store_true", help="Skip video watching and go directly to test (use if video already watched)")
+    parser.add_argument("--redo", action="store_true", help="Batch modes: also process lessons already recorded as completed in the database")
     parser.add_argument("--batch", action="store_true", help="Process multiple lessons in sequence")
     parser.add_argument("--start-id", type=int, help="Starting lesson ID for batch mode")
     parser.add_argument("--end-id", type=int, help="Ending lesson ID for batch mode (optional, will continue until lesson not found)")
     parser.add_argument("--max-lessons", type=int, default=50, help="Maximum number of lessons to process in batch mode (default: 50)")
+    parser.add_argument("--workers", type=int, default=1, help="Number of browser processes to process lessons with in parallel in the full agent and batch modes (default: 1)")
+    parser.add_argument("--tabs", type=int, default=1, help="Number of lessons to process side by side in browser tabs when running the full agent (default: 1)")
     args = parser.parse_args()
     
     load_dotenv()
@@ -1302,8 +2464,7 @@ def main():
         return
     
     if args.test_navigation:
-        agent.setup_driver()
-        agent.setup_ai()
+        agent.setup(database=False)
         try:
             if agent.login():
                 lessons = agent.get_lessons()
@@ -1319,9 +2480,23 @@ def main():
             logger.error("--start-id is required for batch mode")
             return
         
-        agent.setup_driver()
-        agent.setup_ai()
-        agent.setup_database()
+        if args.workers > 1:
+            end_id = args.end_id if args.end_id else (args.start_id + args.max_lessons)
+            lesson_ids = list(range(args.start_id, end_id + 1))[:args.max_lessons]
+            logger.info(f"=== BATCH MODE: lessons {lesson_ids[0]}-{lesson_ids[-1]} with {args.workers} workers ===")
+            processed, failed = _process_lessons_parallel(
+                email, password, args.headless,
+                [(f"Lesson {lesson_id}", UniXAgent.LESSON_URL.format(lesson_id)) for lesson_id in lesson_ids],
+                n_workers=args.workers, skip_video=args.skip_video, redo=args.redo,
+                # Past the last lesson every ID fails, as in the sequential loop
+                max_consecutive_failures=3,
+            )
+            logger.info("BATCH COMPLETE")
+            logger.info(f"Lessons processed: {processed}")
+            logger.info(f"Lessons failed: {failed}")
+            return
+        
+        agent.setup()
         
         try:
             if not agent.login():
@@ -1330,6 +2505,12 @@ def main():
             
             current_id = args.start_id
             end_id = args.end_id if args.end_id else (args.start_id + args.max_lessons)
+            # Resume an interrupted run of the same batch after its last finished
+            # lesson; --redo goes through the whole range again
+            last_done = None if args.redo else _load_batch_checkpoint(email, args.start_id)
+            if last_done is not None and last_done >= current_id:
+                current_id = last_done + 1
+                logger.info(f"Resuming batch after lesson {last_done} (checkpoint)")
             lessons_processed = 0
             lessons_failed = 0
             consecutive_failures = 0
@@ -1342,31 +2523,27 @@ def main():
                 logger.info(f"Will process up to {args.max_lessons} lessons or until not found")
             
             while current_id <= end_id and lessons_processed < args.max_lessons:
-                lesson_url = f"https://uni-x.almv.kz/platform/lessons/{current_id}"
-                logger.info(f"\n{'='*50}")
+                lesson_url = UniXAgent.LESSON_URL.format(current_id)
+                logger.info(f"\n{_BANNER}")
                 logger.info(f"Processing lesson {current_id} ({lessons_processed + 1}/{args.max_lessons})")
-                logger.info(f"{'='*50}")
+                logger.info(_BANNER)
                 
                 try:
-                    # Navigate to lesson
-                    agent.driver.get(lesson_url)
-                    time.sleep(3)
-                    
-                    # Check if lesson exists (look for error page or redirect)
-                    current_url = agent.driver.current_url
-                    page_source = agent.driver.page_source.lower()
+                    # A test fully answered by an earlier run means the lesson is done
+                    if not args.redo and agent._lesson_already_completed(lesson_url):
+                        logger.info(f"Lesson {current_id} already completed in an earlier run, skipping")
+                        consecutive_failures = 0
+                        current_id += 1
+                        continue
                     
-                    # Check for signs that lesson doesn't exist
-                    if (
-                        "404" in page_source or 
-                        "not found" in page_source or
-                        "error" in agent.driver.title.lower() or
-                        "/platform/lessons/" not in current_url
-                    ):
+                    # Navigate to lesson and check it exists (look for error page or redirect)
+                    if not agent._open_lesson(lesson_url):
                         logger.warning(f"Lesson {current_id} not found or not accessible, skipping...")
                         consecutive_failures += 1
                         if consecutive_failures >= max_consecutive_failures:
                             logger.info(f"Reached {max_consecutive_failures} consecutive failures, likely at the end of available lessons")
+                            # Past the last lesson: the batch is done, nothing to resume
+                            _save_batch_checkpoint(email, args.start_id, None)
                             break
                         current_id += 1
                         continue
@@ -1380,9 +2557,9 @@ def main():
                     
                     # Try to get lesson title from page
                     try:
-                        title_elem = agent.driver.find_element(By.CSS_SELECTOR, "h1, .lesson-title, [class*='title']")
-                        if title_elem:
-                            agent.current_lesson_name = title_elem.text.strip()[:100]
+                        agent.current_lesson_name = WebDriverWait(agent.driver, 5, poll_frequency=0.2).until(
+                            lambda d: d.execute_script(_LESSON_TITLE_JS)
+                        )
                     except:
                         pass
                     
@@ -1399,6 +2576,7 @@ def main():
                     
                     lessons_processed += 1
                     logger.info(f"Lesson {current_id} completed successfully!")
+                    _save_batch_checkpoint(email, args.start_id, current_id)
                     
                 except Exception as e:
                     logger.error(f"Error processing lesson {current_id}: {e}")
@@ -1408,19 +2586,18 @@ def main():
                         logger.info(f"Reached {max_consecutive_failures} consecutive failures, stopping batch")
                         break
                 
-                # Move to next lesson
+                # Move to next lesson; the next page load is waited for by
+                # _open_lesson instead of a fixed pause
                 current_id += 1
-                
-                # Small delay between lessons
-                if current_id <= end_id:
-                    logger.info("Waiting before next lesson...")
-                    time.sleep(2)
+            else:
+                # Ran to the end of the range: nothing left to resume
+                _save_batch_checkpoint(email, args.start_id, None)
             
-            logger.info(f"\n{'='*50}")
+            logger.info(f"\n{_BANNER}")
             logger.info(f"BATCH COMPLETE")
             logger.info(f"Lessons processed: {lessons_processed}")
             logger.info(f"Lessons failed: {lessons_failed}")
-            logger.info(f"{'='*50}")
+            logger.info(_BANNER)
             
         except KeyboardInterrupt:
             logger.info("\nBatch interrupted by user")
@@ -1436,27 +2613,37 @@ def main():
         if not ids:
             logger.error("No valid lesson IDs in --lesson-ids")
             return
+        if args.workers > 1:
+            processed, failed = _process_lessons_parallel(
+                email, password, args.headless,
+                [(f"Lesson {lesson_id}", UniXAgent.LESSON_URL.format(lesson_id)) for lesson_id in ids],
+                n_workers=args.workers, skip_video=args.skip_video, redo=args.redo,
+            )
+            logger.info(f"BATCH COMPLETE: {processed} processed, {failed} failed")
+            return
         
-        agent.setup_driver()
-        agent.setup_ai()
-        agent.setup_database()
+        agent.setup()
         try:
             if not agent.login():
                 logger.error("Login failed, cannot process lessons")
                 return
             
             for i, lesson_id in enumerate(ids):
-                lesson_url = f"https://uni-x.almv.kz/platform/lessons/{lesson_id}"
-                logger.info(f"\n{'='*50}")
+                lesson_url = UniXAgent.LESSON_URL.format(lesson_id)
+                logger.info(f"\n{_BANNER}")
                 logger.info(f"Processing lesson {lesson_id} ({i + 1}/{len(ids)})")
-                logger.info(f"{'='*50}")
+                logger.info(_BANNER)
+                
+                if not args.redo and agent._lesson_already_completed(lesson_url):
+                    logger.info(f"Lesson {lesson_id} already completed in an earlier run, skipping")
+                    continue
                 
                 try:
                     agent.current_lesson_url = lesson_url
                     agent.current_lesson_name = f"Lesson {lesson_id}"
                     logger.info(f"Navigating to lesson: {lesson_url}")
                     agent.driver.get(lesson_url)
-                    time.sleep(3)
+                    agent._wait_ready()
                     
                     if args.skip_video:
                         logger.info("Skipping video (--skip-video flag set)")
@@ -1467,14 +2654,10 @@ def main():
                     logger.info(f"Lesson {lesson_id} completed successfully!")
                 except Exception as e:
                     logger.error(f"Error processing lesson {lesson_id}: {e}")
-                
-                if i < len(ids) - 1:
-                    logger.info("Waiting before next lesson...")
-                    time.sleep(2)
             
-            logger.info(f"\n{'='*50}")
+            logger.info(f"\n{_BANNER}")
             logger.info("BATCH COMPLETE")
-            logger.info(f"{'='*50}")
+            logger.info(_BANNER)
         except KeyboardInterrupt:
             logger.info("\nBatch interrupted by user")
         except Exception as e:
@@ -1485,14 +2668,12 @@ def main():
     
     # Process specific lesson
     if args.lesson:
-        agent.setup_driver()
-        agent.setup_ai()
-        agent.setup_database()
+        agent.setup()
         try:
             if agent.login():
                 logger.info(f"Navigating to lesson: {args.lesson}")
                 agent.driver.get(args.lesson)
-                time.sleep(3)
+                agent._wait_ready()
                 
                 # Update lesson info
                 agent.current_lesson_url = args.lesson
@@ -1518,7 +2699,10 @@ def main():
         return
     
     # Run full agent
-    agent.run()
+    if args.workers > 1:
+        agent.run_parallel(n_workers=args.workers)
+    else:
+        agent.run(tabs=args.tabs)
 
 
 if __name__ == "__main__":